@@ -0,0 +1,117 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+import metrics
+
+# Nombre de threads qui exécutent les requêtes (par défaut : un par connexion du pool)
+DB_WORKERS = int(os.getenv('DB_WORKERS', database.DB_POOL_MAX_SIZE))
+
+class AsyncDatabase:
+    """Façade asynchrone de database.py : chaque helper s'exécute dans un pool de threads
+    pour ne jamais bloquer la boucle d'événements de discord.py.
+
+    Utilisation : ``await db.get_balance(user_id)``.
+    """
+
+    def __init__(self, workers=DB_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._wrappers = {}
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._queued = 0
+        self._running = 0
+        self._max_queued = 0
+        self._total_wait = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="db")
+        return self._executor
+
+    async def run(self, func, *args, **kwargs):
+        """Exécute une fonction bloquante dans le pool de threads et attend son résultat."""
+        loop = asyncio.get_running_loop()
+        submitted_at = time.monotonic()
+        with self._lock:
+            self._submitted += 1
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+
+        # Le contexte de la tâche n'est pas transmis au thread : la commande en cours est lue ici
+        interaction = metrics.current_interaction()
+        elapsed = 0.0
+
+        def call():
+            nonlocal elapsed
+            started_at = time.monotonic()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._total_wait += started_at - submitted_at
+            failed = False
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                elapsed = time.monotonic() - started_at
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    if failed:
+                        self._failed += 1
+                metrics.record_db_call(func.__name__, started_at - submitted_at, elapsed, failed)
+
+        try:
+            return await loop.run_in_executor(self._get_executor(), call)
+        finally:
+            if interaction is not None:
+                interaction.db_calls += 1
+                interaction.db_seconds += elapsed
+
+    def get_metrics(self):
+        """Retourne l'état du pool de threads : profondeur de file, appels en cours, attente moyenne."""
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "workers": self.workers,
+                "queued": self._queued,
+                "running": self._running,
+                "max_queued": self._max_queued,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "avg_wait_ms": (self._total_wait / started * 1000) if started else 0.0,
+            }
+
+    def shutdown(self, wait=True):
+        """Arrête le pool de threads après les requêtes en cours."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def __getattr__(self, name):
+        func = getattr(database, name)
+        if not callable(func):
+            raise AttributeError(name)
+        wrapper = self._wrappers.get(name)
+        if wrapper is None:
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                return await self.run(func, *args, **kwargs)
+            self._wrappers[name] = wrapper
+        return wrapper
+
+db = AsyncDatabase()
@@ -0,0 +1,147 @@
+"""
+Mesure l'effet des index du catalogue (migrations.CATALOGUE_INDEXES, tels que remplacés par
+les index par serveur de la migration 7) sur les recherches fréquentes, sur un catalogue
+synthétique réparti entre plusieurs serveurs et créé dans un schéma temporaire.
+
+Utilisation :
+    DATABASE_URL=postgresql://... python benchmarks/catalogue_indexes.py --items 100000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+import psycopg2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import database
+import migrations
+
+SCHEMA = "bench_catalogue"
+
+def guild_of(shop_id, guilds):
+    """Serveur d'un shop (même formule que seed())."""
+    return shop_id % guilds + 1
+
+def random_item(shops, items, guilds):
+    """(guild_id, shop_id, nom) d'un item existant."""
+    n = random.randrange(items)
+    shop_id = n % shops + 1
+    return guild_of(shop_id, guilds), shop_id, f"item-{n}"
+
+def random_shop(shops, items, guilds):
+    shop_id = random.randrange(1, shops + 1)
+    return guild_of(shop_id, guilds), shop_id
+
+# Les requêtes de database.py, toutes filtrées par serveur depuis la migration 7
+QUERIES = {
+    "get_item_by_name": (
+        "SELECT item_id, name, price, description, stock, active FROM items WHERE guild_id = %s AND name = %s ORDER BY item_id LIMIT 1",
+        lambda *scale: random_item(*scale)[::2],  # (guild_id, nom)
+    ),
+    "get_shop_items_page": (
+        "SELECT item_id, name, price, description, stock FROM items WHERE shop_id = %s AND active = 1 AND guild_id = %s ORDER BY price, item_id LIMIT 5",
+        lambda *scale: random_shop(*scale)[::-1],  # (shop_id, guild_id)
+    ),
+    "add_item (doublon)": (
+        "SELECT item_id FROM items WHERE guild_id = %s AND shop_id = %s AND name = %s",
+        lambda *scale: random_item(*scale),
+    ),
+}
+
+def catalogue_indexes():
+    """Index de la table items après la migration 7 : ceux de la migration 3 qu'elle n'a pas remplacés, puis les siens."""
+    replaced = {name for name, _ in migrations.GUILD_INDEXES if name}
+    kept = [statement for statement in migrations.CATALOGUE_INDEXES if not any(f" {name} " in statement for name in replaced)]
+    return kept + [statement for _, statement in migrations.GUILD_INDEXES if " ON items " in statement]
+
+def seed(cursor, items, shops, guilds):
+    cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+    cursor.execute(f"SET search_path TO {SCHEMA}")
+    cursor.execute("""
+        CREATE TABLE items (
+            item_id SERIAL PRIMARY KEY,
+            guild_id BIGINT NOT NULL,
+            shop_id INTEGER,
+            name TEXT NOT NULL,
+            price INTEGER NOT NULL,
+            description TEXT DEFAULT '',
+            stock INTEGER DEFAULT -1,
+            active INTEGER DEFAULT 1
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO items (guild_id, shop_id, name, price, description, stock, active)
+        SELECT (n %% %(shops)s + 1) %% %(guilds)s + 1,
+               (n %% %(shops)s) + 1,
+               'item-' || n,
+               1 + (n * 7919) %% 10000,
+               'Description de l''item ' || n,
+               -1,
+               CASE WHEN n %% 10 = 0 THEN 0 ELSE 1 END
+        FROM generate_series(0, %(items)s - 1) AS n
+    """, {"items": items, "shops": shops, "guilds": guilds})
+    cursor.execute("ANALYZE items")
+
+def measure(cursor, scale, iterations):
+    results = {}
+    for label, (query, make_params) in QUERIES.items():
+        cursor.execute("EXPLAIN (FORMAT JSON) " + query, make_params(*scale))
+        plan = cursor.fetchone()[0]
+        plan = plan[0]["Plan"] if isinstance(plan, list) else json.loads(plan)[0]["Plan"]
+        while plan.get("Plans") and plan["Node Type"] in ("Limit", "Sort"):
+            plan = plan["Plans"][0]
+
+        timings = []
+        for _ in range(iterations):
+            params = make_params(*scale)
+            started = time.perf_counter()
+            cursor.execute(query, params)
+            cursor.fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results[label] = (plan["Node Type"], statistics.median(timings), timings[int(len(timings) * 0.99) - 1])
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--shops", type=int, default=200)
+    parser.add_argument("--guilds", type=int, default=20, help="Serveurs entre lesquels les shops sont répartis")
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--keep", action="store_true", help="Conserver le schéma de test après la mesure")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(database.DATABASE_URL)
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        print(f"Création de {args.items} items répartis sur {args.shops} shops de {args.guilds} serveurs dans le schéma {SCHEMA}...")
+        seed(cursor, args.items, args.shops, args.guilds)
+        scale = (args.shops, args.items, args.guilds)
+        before = measure(cursor, scale, args.iterations)
+
+        for statement in catalogue_indexes():
+            cursor.execute(statement)
+        cursor.execute("ANALYZE items")
+        after = measure(cursor, scale, args.iterations)
+
+        print(f"\n{'Requête':<22}{'Plan sans index':<20}{'p50 / p99 (ms)':<20}{'Plan avec index':<20}{'p50 / p99 (ms)':<20}{'Gain p50':>9}")
+        for label in QUERIES:
+            plan_before, p50_before, p99_before = before[label]
+            plan_after, p50_after, p99_after = after[label]
+            print(
+                f"{label:<22}{plan_before:<20}{f'{p50_before:.3f} / {p99_before:.3f}':<20}"
+                f"{plan_after:<20}{f'{p50_after:.3f} / {p99_after:.3f}':<20}{p50_before / p50_after:>8.1f}x"
+            )
+    finally:
+        if not args.keep:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Banc de charge des cogs Economy, Shop et Inventory : appelle directement les callbacks des
+commandes slash avec de fausses interactions Discord, contre un PostgreSQL local. Les
+utilisateurs, shops et items synthétiques sont créés dans un schéma temporaire, mis à jour
+par migrations.py.
+
+Rapporte, pour /balance, /pay, /acheter, /vendre, /collect et /inventaire, la latence p50/p99
+(callback complet : code du cog, caches, base) et le débit en commandes par seconde.
+
+Utilisation :
+    DATABASE_URL=postgresql://... python benchmarks/load_test.py --users 100000 --concurrency 32
+    ACCOUNT_CACHE_SIZE=0 DATABASE_URL=... python benchmarks/load_test.py  # sans cache des comptes
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+SCHEMA = "bench_load"
+GUILD_ID = 1
+ROLE_ID = 1  # Rôle salarié de tous les utilisateurs synthétiques
+SCENARIOS = ("balance", "pay", "acheter", "vendre", "collect", "inventaire")
+
+# Toutes les connexions du pool travaillent dans le schéma de test (lu par libpq à la connexion)
+os.environ["PGOPTIONS"] = f"{os.environ.get('PGOPTIONS', '')} -c search_path={SCHEMA}".strip()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+import psycopg2
+
+import database
+import migrations
+from async_database import db
+from commands.economy import Economy
+from commands.inventory import Inventory
+from commands.shop import Shop
+
+class FakeAsset:
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+class FakeRole:
+    def __init__(self, role_id, name):
+        self.id = role_id
+        self.name = name
+        self.members = []
+
+class FakeMember:
+    """Membre minimal : ce que les cogs lisent d'un discord.Member."""
+
+    def __init__(self, user_id, roles=()):
+        self.id = user_id
+        self.display_name = f"user-{user_id}"
+        self.mention = f"<@{user_id}>"
+        self.display_avatar = FakeAsset()  # Avatar par défaut de Discord si le membre n'en a pas
+        self.roles = list(roles)
+        self.bot = False
+
+    def __eq__(self, other):
+        return isinstance(other, FakeMember) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+class FakeGuild:
+    def __init__(self, guild_id, roles):
+        self.id = guild_id
+        self.roles = roles
+        self._roles = {role.id: role for role in roles}
+
+    def get_role(self, role_id):
+        return self._roles.get(role_id)
+
+class FakeResponse:
+    """Enregistre la réponse au lieu de l'envoyer à Discord."""
+
+    def __init__(self):
+        self.embed = None
+        self._done = False
+
+    async def send_message(self, content=None, *, embed=None, **kwargs):
+        self.embed = embed
+        self._done = True
+
+    async def defer(self, **kwargs):
+        self._done = True
+
+    async def edit_message(self, *, embed=None, **kwargs):
+        self.embed = embed
+
+    def is_done(self):
+        return self._done
+
+class FakeFollowup:
+    def __init__(self, response):
+        self.response = response
+
+    async def send(self, content=None, *, embed=None, **kwargs):
+        self.response.embed = embed
+
+class FakeInteraction:
+    def __init__(self, guild, user):
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = user
+        self.response = FakeResponse()
+        self.followup = FakeFollowup(self.response)
+        self.extras = {}
+
+    async def original_response(self):
+        return None
+
+def item_ref(index, shops):
+    """(shop_id, nom) de l'item numéro `index` créé par seed()."""
+    return index % shops + 1, f"item-{index}"
+
+def owned_item_index(user_id, slot, items, items_per_user):
+    """Numéro du `slot`-ième item possédé par un utilisateur (même formule que seed())."""
+    return (user_id + slot * (items // items_per_user)) % items
+
+def seed(cursor, args):
+    cursor.execute(f"SET search_path TO {SCHEMA}")
+    params = {
+        "guild": GUILD_ID, "role": ROLE_ID, "users": args.users, "shops": args.shops,
+        "items": args.items, "per_user": args.items_per_user, "stride": args.items // args.items_per_user,
+    }
+    cursor.execute("""
+        INSERT INTO users (guild_id, user_id, balance, total)
+        SELECT %(guild)s, n, 1000000, 1001000 FROM generate_series(1, %(users)s) AS n
+    """, params)
+    cursor.execute("""
+        INSERT INTO bank_deposit (guild_id, user_id, amount)
+        SELECT %(guild)s, n, 1000 FROM generate_series(1, %(users)s) AS n
+    """, params)
+    cursor.execute("""
+        INSERT INTO shops (guild_id, name, description)
+        SELECT %(guild)s, 'shop-' || n, '' FROM generate_series(1, %(shops)s) AS n
+    """, params)
+    # Les shops et les items sont créés dans l'ordre de leur séquence : shop_id = n, item_id = n + 1
+    cursor.execute("""
+        INSERT INTO items (guild_id, shop_id, name, price, description, stock, active)
+        SELECT %(guild)s, n %% %(shops)s + 1, 'item-' || n, 1 + n %% 100, '', -1, 1
+        FROM generate_series(0, %(items)s - 1) AS n
+    """, params)
+    cursor.execute("""
+        INSERT INTO user_items (guild_id, user_id, shop_id, item_id, quantity)
+        SELECT %(guild)s, u, i %% %(shops)s + 1, i + 1, 1000
+        FROM generate_series(1, %(users)s) AS u
+        CROSS JOIN generate_series(0, %(per_user)s - 1) AS slot
+        CROSS JOIN LATERAL (SELECT (u + slot * %(stride)s) %% %(items)s AS i) AS owned
+    """, params)
+    cursor.execute("""
+        INSERT INTO role_salaries (guild_id, role_id, salary, cooldown)
+        VALUES (%(guild)s, %(role)s, 10, 0)
+    """, params)
+    for table in ("users", "bank_deposit", "shops", "items", "user_items", "role_salaries"):
+        cursor.execute(f"ANALYZE {table}")
+
+def build_scenarios(args, economy, shop, inventory):
+    """Nom -> fonction(interaction) qui appelle le callback de la commande avec des arguments aléatoires."""
+    def other_member(user_id):
+        other = random.randint(1, args.users - 1)
+        return FakeMember(other + 1 if other >= user_id else other)
+
+    def owned_item(user_id):
+        return item_ref(owned_item_index(user_id, random.randrange(args.items_per_user), args.items, args.items_per_user), args.shops)
+
+    return {
+        "balance": lambda interaction: economy.balance.callback(economy, interaction),
+        "pay": lambda interaction: economy.pay.callback(economy, interaction, other_member(interaction.user.id), 1),
+        "acheter": lambda interaction: shop.acheter.callback(shop, interaction, *item_ref(random.randrange(args.items), args.shops)),
+        "vendre": lambda interaction: shop.vendre.callback(shop, interaction, *owned_item(interaction.user.id)),
+        "collect": lambda interaction: economy.collect.callback(economy, interaction),
+        "inventaire": lambda interaction: inventory.inventaire.callback(inventory, interaction),
+    }
+
+async def run_scenario(call, guild, args, operations):
+    """Exécute `operations` commandes avec `args.concurrency` commandes simultanées."""
+    timings = []
+    errors = []
+    refused = 0
+    remaining = operations
+
+    async def worker():
+        nonlocal remaining, refused
+        while remaining > 0:
+            remaining -= 1
+            interaction = FakeInteraction(guild, FakeMember(random.randint(1, args.users), guild.roles))
+            started = time.perf_counter()
+            try:
+                await call(interaction)
+            except Exception as e:
+                errors.append(e)
+                continue
+            timings.append((time.perf_counter() - started) * 1000)
+            embed = interaction.response.embed
+            if embed is not None and embed.color == discord.Color.red():
+                refused += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    return timings, errors, refused, elapsed
+
+async def run(args):
+    guild = FakeGuild(GUILD_ID, [FakeRole(ROLE_ID, "Salarié")])
+    economy, shop, inventory = Economy(None), Shop(None), Inventory(None)
+    scenarios = build_scenarios(args, economy, shop, inventory)
+
+    results = {}
+    for name in args.commands:
+        call = scenarios[name]
+        if args.warmup:
+            await run_scenario(call, guild, args, args.warmup)
+        timings, errors, refused, elapsed = await run_scenario(call, guild, args, args.operations)
+        timings.sort()
+        results[name] = {
+            "operations": args.operations,
+            "errors": len(errors),
+            "refused": refused,
+            "p50_ms": statistics.median(timings) if timings else None,
+            "p99_ms": timings[max(int(len(timings) * 0.99) - 1, 0)] if timings else None,
+            "per_second": len(timings) / elapsed if elapsed else None,
+        }
+        if errors:
+            print(f"/{name} : {len(errors)} erreur(s), par exemple {type(errors[0]).__name__}: {errors[0]}", file=sys.stderr)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--shops", type=int, default=50)
+    parser.add_argument("--items", type=int, default=1_000)
+    parser.add_argument("--items-per-user", type=int, default=5, help="Items différents possédés par chaque utilisateur")
+    parser.add_argument("--operations", type=int, default=2_000, help="Commandes mesurées par scénario")
+    parser.add_argument("--warmup", type=int, default=200, help="Commandes non mesurées avant chaque scénario")
+    parser.add_argument("--concurrency", type=int, default=32, help="Commandes exécutées simultanément")
+    parser.add_argument("--commands", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--json", help="Écrire aussi les résultats dans ce fichier (référence à comparer)")
+    parser.add_argument("--verbose", action="store_true", help="Afficher les messages de database.py pendant la mesure")
+    parser.add_argument("--keep", action="store_true", help="Conserver le schéma de test après la mesure")
+    args = parser.parse_args()
+    if args.users < 2 or args.items < args.items_per_user:
+        parser.error("il faut au moins 2 utilisateurs et au moins --items-per-user items")
+
+    conn = psycopg2.connect(database.DATABASE_URL)
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+        migrations.run_migrations()
+        print(f"Création de {args.users} utilisateurs, {args.shops} shops et {args.items} items dans le schéma {SCHEMA}...")
+        started = time.perf_counter()
+        seed(cursor, args)
+        print(f"Données créées en {time.perf_counter() - started:.1f}s")
+
+        # database.py journalise chaque opération avec print()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+            results = asyncio.run(run(args))
+
+        print(f"\n{'Commande':<14}{'Opérations':>11}{'Erreurs':>9}{'Refus':>8}{'p50 (ms)':>11}{'p99 (ms)':>11}{'Cmd/s':>10}")
+        for name, result in results.items():
+            if result["p50_ms"] is None:
+                print(f"{'/' + name:<14}{result['operations']:>11}{result['errors']:>9}{result['refused']:>8}{'-':>11}{'-':>11}{'-':>10}")
+                continue
+            print(
+                f"{'/' + name:<14}{result['operations']:>11}{result['errors']:>9}{result['refused']:>8}"
+                f"{result['p50_ms']:>11.2f}{result['p99_ms']:>11.2f}{result['per_second']:>10.0f}"
+            )
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"scale": vars(args), "results": results}, f, indent=2)
+    finally:
+        db.shutdown()
+        database.close_pool()
+        if not args.keep:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
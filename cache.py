@@ -0,0 +1,271 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Valeur renvoyée par TTLCache.get() quand la clé est absente ou expirée
+MISSING = object()
+
+class TTLCache:
+    """
+    Cache LRU en mémoire, thread-safe, dont les entrées expirent après `ttl` secondes.
+
+    `generation` augmente à chaque invalidation : un lecteur le relève avant sa requête et le passe
+    à set(), qui ignore alors un résultat lu avant une écriture invalidée entre-temps.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, generation=None):
+        """Enregistre une valeur ; ignorée si `generation` est donnée et qu'une invalidation a eu lieu depuis."""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._data.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """Supprime toutes les entrées dont la clé satisfait `predicate`."""
+        with self._lock:
+            self.generation += 1
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class AccountRecord:
+    """Compte en cache : portefeuille, banque et quantité totale d'items (None si pas encore chargée)."""
+    __slots__ = ("wallet", "bank", "items", "expires_at")
+
+    def __init__(self, wallet, bank, items, expires_at):
+        self.wallet = wallet
+        self.bank = bank
+        self.items = items
+        self.expires_at = expires_at
+
+class AccountCache:
+    """
+    Cache LRU des comptes utilisateurs, tenu à jour par les écritures (write-through).
+    Un compte est identifié par sa clé (guild_id, user_id).
+
+    Le chargement d'un compte et les écritures qui le modifient sont sérialisés par un verrou
+    choisi parmi `stripes` selon la clé du compte (voir lock()).
+    """
+
+    def __init__(self, maxsize=100_000, ttl=300, stripes=64):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._stripes = [threading.RLock() for _ in range(stripes)]
+        self.hits = 0
+        self.misses = 0
+
+    @contextmanager
+    def _hold(self, stripes):
+        for index in stripes:
+            self._stripes[index].acquire()
+        try:
+            yield
+        finally:
+            for index in reversed(stripes):
+                self._stripes[index].release()
+
+    def lock(self, *keys):
+        """Verrouille les comptes donnés, toujours dans le même ordre pour éviter les interblocages."""
+        return self._hold(sorted({hash(key) % len(self._stripes) for key in keys}))
+
+    def drain(self):
+        """
+        Attend la fin des écritures en cours : prend puis relâche chaque verrou, un à la fois.
+        Toute écriture commencée avant l'appel est alors validée ou annulée.
+        """
+        for stripe in self._stripes:
+            with stripe:
+                pass
+
+    def get(self, key, with_items=False):
+        """Retourne (wallet, bank, items), ou None si le compte est absent, expiré ou sans items connus."""
+        with self._lock:
+            record = self._data.get(key)
+            if record is not None and record.expires_at < time.monotonic():
+                del self._data[key]
+                record = None
+            if record is None or (with_items and record.items is None):
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return record.wallet, record.bank, record.items
+
+    def peek(self, key):
+        """Comme get(), sans compter d'accès ni rafraîchir la position LRU."""
+        with self._lock:
+            record = self._data.get(key)
+            if record is None or record.expires_at < time.monotonic():
+                return None
+            return record.wallet, record.bank, record.items
+
+    def set(self, key, wallet, bank, items=None):
+        """Enregistre un compte lu en base (l'appelant tient lock(key))."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = AccountRecord(wallet, bank, items, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def update(self, key, wallet=None, bank=None, items_delta=0):
+        """Répercute une écriture sur un compte en cache (sans effet s'il n'y est pas) ; None = inchangé."""
+        with self._lock:
+            record = self._data.get(key)
+            if record is None:
+                return
+            if wallet is not None:
+                record.wallet = wallet
+            if bank is not None:
+                record.bank = bank
+            if items_delta and record.items is not None:
+                record.items += items_delta
+
+    def invalidate(self, *keys):
+        with self.lock(*keys), self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class Ranking:
+    """
+    Classement des valeurs les plus élevées (top-N), maintenu incrémentalement à partir des écritures.
+
+    Invariant : tout utilisateur absent de la table a une valeur <= `floor` (None : la table contient
+    tout le monde). Les N premiers de la table sont donc exactement les N premiers du classement,
+    tant que la table contient au moins N entrées.
+
+    Chargement : begin_load(), puis la requête, puis load(). Les écritures répercutées entre-temps
+    sont mises de côté et rejouées par load() sur le résultat de la requête. Des chargements
+    concurrents partagent la même session ; une invalidation en ouvre une nouvelle.
+    """
+
+    def __init__(self, capacity=200):
+        self.capacity = capacity
+        self._values = None  # {user_id: valeur}, None tant que le classement n'est pas chargé
+        self._floor = None
+        self._pending = None  # [(user_id, valeur)] reçus pendant un chargement, None hors chargement
+        self._lock = threading.Lock()
+
+    def begin_load(self):
+        """Commence à mettre de côté les écritures, avant la requête de chargement ; retourne la session à passer à load()."""
+        with self._lock:
+            if self._pending is None:
+                self._pending = []
+            return self._pending
+
+    def load(self, rows, session):
+        """
+        Installe le résultat d'une requête top-`capacity` triée par valeur décroissante, lancée après
+        begin_load(), et y rejoue les écritures reçues depuis. Sans effet si la session est terminée :
+        un chargement concurrent a déjà installé le sien, ou le classement a été invalidé entre-temps.
+        """
+        with self._lock:
+            if self._pending is not session:
+                return
+            self._values = dict(rows)
+            self._floor = rows[-1][1] if len(rows) >= self.capacity else None
+            for user_id, value in self._pending:
+                self._apply(user_id, value)
+            self._pending = None
+
+    def update(self, user_id, value):
+        """Répercute la nouvelle valeur d'un utilisateur."""
+        with self._lock:
+            if self._values is not None:
+                self._apply(user_id, value)
+            elif self._pending is not None:
+                self._pending.append((user_id, value))
+
+    def _apply(self, user_id, value):
+        values = self._values
+        if self._floor is not None and value < self._floor:
+            values.pop(user_id, None)
+        elif self._floor is None or value > self._floor or user_id in values:
+            values[user_id] = value
+        if len(values) > self.capacity:
+            dropped = sorted(values.items(), key=lambda entry: entry[1])[:len(values) - self.capacity]
+            for dropped_id, _ in dropped:
+                del values[dropped_id]
+            self._floor = dropped[-1][1]
+
+    @property
+    def loaded(self):
+        return self._values is not None
+
+    @property
+    def tracking(self):
+        """Vrai si les écritures doivent être répercutées : classement chargé ou en cours de chargement."""
+        return self._values is not None or self._pending is not None
+
+    def invalidate(self):
+        with self._lock:
+            self._values = None
+            self._pending = None
+
+    def top(self, limit):
+        """Les `limit` premiers [(user_id, valeur)], ou None s'il faut recharger le classement."""
+        with self._lock:
+            values = self._values
+            if values is None:
+                return None
+            if len(values) < limit and self._floor is not None:
+                self._values = None
+                return None
+            return sorted(values.items(), key=lambda entry: (-entry[1], entry[0]))[:limit]
+
+    def rank_of(self, user_id):
+        """(rang, valeur) d'un utilisateur présent dans la table, sinon None."""
+        with self._lock:
+            values = self._values
+            if values is None or user_id not in values:
+                return None
+            value = values[user_id]
+            return 1 + sum(1 for other in values.values() if other > value), value
@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+
+# Colonnes des fichiers d'import/export du catalogue, dans l'ordre de l'export CSV
+CATALOGUE_COLUMNS = ("shop_id", "name", "price", "description", "stock", "active")
+
+# Bornes du type INTEGER de PostgreSQL (colonnes shop_id, price et stock)
+INTEGER_MIN = -2**31
+INTEGER_MAX = 2**31 - 1
+
+def _read_records(data, filename):
+    """Décode un fichier CSV (avec en-tête) ou JSON (liste d'objets) en [(ligne, dict)]."""
+    text = data.decode("utf-8-sig")
+    if filename.lower().endswith(".json"):
+        records = json.loads(text)
+        if isinstance(records, dict):
+            records = records.get("items")
+        if not isinstance(records, list):
+            raise ValueError("Le JSON doit être une liste d'items (ou un objet avec une clé \"items\").")
+        return list(enumerate(records, start=1))
+
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        raise ValueError("Le CSV est vide.")
+    missing = {"shop_id", "name", "price"} - {field.strip() for field in reader.fieldnames}
+    if missing:
+        raise ValueError(f"Colonnes manquantes dans le CSV : {', '.join(sorted(missing))}")
+    # La ligne 1 est l'en-tête
+    return [(line, {key.strip(): value for key, value in row.items() if key}) for line, row in enumerate(reader, start=2)]
+
+def _to_int(value, default=None):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return default
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError
+    return int(value.strip()) if isinstance(value, str) else int(value)
+
+def parse_catalogue(data, filename, max_rows=None):
+    """
+    Lit et valide un fichier d'items à importer, avec les mêmes règles que /add_item.
+    :param data: contenu brut du fichier (bytes)
+    :param filename: nom du fichier, .json ou .csv
+    :return: (rows, errors) où rows est une liste de tuples dans l'ordre de CATALOGUE_COLUMNS
+             et errors une liste de messages "ligne N : ..."
+    """
+    try:
+        records = _read_records(data, filename)
+    except (UnicodeDecodeError, json.JSONDecodeError, csv.Error) as e:
+        return [], [f"Fichier illisible : {e}"]
+    except ValueError as e:
+        return [], [str(e)]
+
+    if max_rows is not None and len(records) > max_rows:
+        return [], [f"Trop d'items : {len(records)} (maximum {max_rows} par import)"]
+
+    rows = []
+    errors = []
+    seen = {}
+    for line, record in records:
+        if not isinstance(record, dict):
+            errors.append(f"ligne {line} : un objet est attendu")
+            continue
+        try:
+            shop_id = _to_int(record.get("shop_id"))
+        except (TypeError, ValueError):
+            shop_id = None
+        name = record.get("name")
+        name = name.strip() if isinstance(name, str) else ""
+        description = record.get("description") or ""
+
+        try:
+            price = _to_int(record.get("price"))
+            stock = _to_int(record.get("stock"), -1)
+            active = _to_int(record.get("active"), 1)
+        except (TypeError, ValueError):
+            errors.append(f"ligne {line} : price, stock et active doivent être des entiers")
+            continue
+
+        if shop_id is None or not INTEGER_MIN <= shop_id <= INTEGER_MAX:
+            errors.append(f"ligne {line} : shop_id manquant ou invalide")
+        elif not name:
+            errors.append(f"ligne {line} : name manquant")
+        elif price is None or price < 1:
+            errors.append(f"ligne {line} : price doit être > 0")
+        elif price > INTEGER_MAX:
+            errors.append(f"ligne {line} : price ne doit pas dépasser {INTEGER_MAX}")
+        elif stock < -1:
+            errors.append(f"ligne {line} : stock doit être >= 0 (ou -1 pour illimité)")
+        elif stock > INTEGER_MAX:
+            errors.append(f"ligne {line} : stock ne doit pas dépasser {INTEGER_MAX}")
+        elif active not in (0, 1):
+            errors.append(f"ligne {line} : active doit valoir 0 ou 1")
+        elif not isinstance(description, str):
+            errors.append(f"ligne {line} : description doit être un texte")
+        elif (shop_id, name) in seen:
+            errors.append(f"ligne {line} : '{name}' apparaît déjà ligne {seen[(shop_id, name)]} pour le shop {shop_id}")
+        else:
+            seen[(shop_id, name)] = line
+            rows.append((shop_id, name, price, description, stock, active))
+    return rows, errors
@@ -0,0 +1,88 @@
+import discord
+from discord.ui import Button, View
+from collections import OrderedDict
+
+class PaginatorView(View):
+    """Pagination paresseuse : chaque page est lue en base à la demande puis gardée dans un petit cache."""
+
+    def __init__(self, author_id, fetch_page, page_key, render_page, items_per_page=5, timeout=60, cache_size=10):
+        super().__init__(timeout=timeout)
+        self.author_id = author_id
+        self.fetch_page = fetch_page  # async (after, limit) -> lignes
+        self.page_key = page_key  # ligne -> clé "after" de la page suivante
+        self.render_page = render_page  # (lignes, numéro de page) -> embed
+        self.items_per_page = items_per_page
+        self.cache_size = cache_size
+        self.starts = [None]  # Clé de début de chaque page déjà atteinte
+        self.pages = OrderedDict()  # numéro -> (embed, page suivante ?), au plus cache_size pages
+        self.current_page = 0
+        self.has_next = False
+
+        # Boutons précédent/suivant
+        self.prev_button = Button(emoji="⬅️", style=discord.ButtonStyle.blurple)
+        self.next_button = Button(emoji="➡️", style=discord.ButtonStyle.blurple)
+        
+        self.prev_button.callback = self.previous_page
+        self.next_button.callback = self.next_page
+        
+        self.add_item(self.prev_button)
+        self.add_item(self.next_button)
+
+    async def load_page(self, index):
+        """Retourne l'embed de la page `index`, lu en base (une ligne de plus pour savoir s'il y a une suite)."""
+        page = self.pages.get(index)
+        if page is None:
+            rows = await self.fetch_page(self.starts[index], self.items_per_page + 1)
+            has_next = len(rows) > self.items_per_page
+            rows = rows[:self.items_per_page]
+            if has_next and len(self.starts) == index + 1:
+                self.starts.append(self.page_key(rows[-1]))
+            page = (self.render_page(rows, index + 1), has_next)
+            self.pages[index] = page
+            while len(self.pages) > self.cache_size:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(index)
+        self.current_page = index
+        self.has_next = page[1]
+        self.update_buttons()
+        return page[0]
+
+    async def start(self, interaction: discord.Interaction, empty_embed: discord.Embed):
+        """Envoie la première page, sans boutons s'il n'y en a qu'une, ou `empty_embed` s'il n'y a aucune ligne."""
+        embed = await self.load_page(0)
+        if not embed.fields:
+            return await interaction.response.send_message(embed=empty_embed, ephemeral=True)
+
+        if not self.has_next:
+            return await interaction.response.send_message(embed=embed)
+
+        await interaction.response.send_message(embed=embed, view=self)
+        self.message = await interaction.original_response()
+
+    def update_buttons(self):
+        self.prev_button.disabled = self.current_page == 0
+        self.next_button.disabled = not self.has_next
+
+    async def previous_page(self, interaction: discord.Interaction):
+        if interaction.user.id != self.author_id:
+            return await interaction.response.send_message("Seul l'auteur peut interagir.", ephemeral=True)
+        
+        embed = await self.load_page(max(0, self.current_page - 1))
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    async def next_page(self, interaction: discord.Interaction):
+        if interaction.user.id != self.author_id:
+            return await interaction.response.send_message("Seul l'auteur peut interagir.", ephemeral=True)
+        
+        embed = await self.load_page(self.current_page + 1 if self.has_next else self.current_page)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    async def on_timeout(self):
+        # Désactive les boutons quand le timeout est atteint
+        for item in self.children:
+            item.disabled = True
+        try:
+            await self.message.edit(view=self)
+        except:
+            pass
@@ -1,128 +1,149 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
-import database
+from discord.ext import commands, tasks
+from async_database import db
+from database import ROLE_SALARIES_REFRESH_INTERVAL, BankStatus
+import re
 import time
 
+LEADERBOARD_SIZE = 10  # Membres affichés par /leaderboard
+MEMBER_ID_PATTERN = re.compile(r"<@!?(\d{15,20})>|(\d{15,20})")  # Mention <@id> ou ID brut d'un membre dans /bulk_money
+MAX_IGNORED_SHOWN = 20  # Entrées ignorées listées dans la réponse de /bulk_money
+
 class Economy(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+
+    async def cog_load(self):
+        self.reconcile_salaries.start()
+
+    async def cog_unload(self):
+        self.reconcile_salaries.cancel()
+
+    @tasks.loop(seconds=ROLE_SALARIES_REFRESH_INTERVAL)
+    async def reconcile_salaries(self):
+        """Resynchronise périodiquement la table des salaires gardée en mémoire avec la base."""
+        try:
+            await db.refresh_role_salaries()
+        except Exception as e:
+            print(f"Erreur lors de la resynchronisation des salaires : {e}")
     
     @app_commands.command(name="balance", description="Affiche le solde d'un utilisateur")
     @app_commands.describe(membre="Le membre dont vous voulez voir le solde")
     async def balance(self, interaction: discord.Interaction, membre: discord.Member = None):
         """Affiche le solde d'un utilisateur."""
         member = membre or interaction.user
-        balance = database.get_balance(member.id)
-        deposit = database.get_deposit(member.id)
+        account = await db.get_account(interaction.guild_id, member.id)
 
         embed = discord.Embed(title=f"Solde de {member.display_name}", color=discord.Color.gold())
-        embed.add_field(name="💰 Argent en poche", value=f"{balance} coins", inline=False)
-        embed.add_field(name="🏦 En banque", value=f"{deposit} coins", inline=False)
-        embed.set_thumbnail(url=member.avatar.url if member.avatar else discord.Embed.Empty)
+        embed.add_field(name="💰 Argent en poche", value=f"{account.wallet} coins", inline=False)
+        embed.add_field(name="🏦 En banque", value=f"{account.bank} coins", inline=False)
+        embed.set_thumbnail(url=member.display_avatar.url)
         await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(name="leaderboard", description="Affiche le classement des membres les plus riches")
+    @app_commands.describe(classement="Le classement à afficher (défaut: fortune totale)")
+    @app_commands.choices(classement=[
+        app_commands.Choice(name="Fortune totale", value="total"),
+        app_commands.Choice(name="Argent en poche", value="wallet"),
+        app_commands.Choice(name="En banque", value="bank"),
+    ])
+    async def leaderboard(self, interaction: discord.Interaction, classement: app_commands.Choice[str] = None):
+        """Affiche les 10 membres les plus riches et le rang de l'utilisateur."""
+        kind = classement.value if classement else "total"
+        title = {"total": "Fortune totale", "wallet": "Argent en poche", "bank": "En banque"}[kind]
+        top = await db.get_leaderboard(interaction.guild_id, kind, LEADERBOARD_SIZE)
+        rank, value = await db.get_rank(interaction.guild_id, interaction.user.id, kind)
+
+        medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+        lines = [
+            f"{medals.get(position, f'**{position}.**')} <@{user_id}> — {amount} coins"
+            for position, (user_id, amount) in enumerate(top, start=1)
+            if amount > 0
+        ]
+        embed = discord.Embed(
+            title=f"🏆 Classement : {title}",
+            description="\n".join(lines) if lines else "Personne n'a encore d'argent.",
+            color=discord.Color.gold()
+        )
+        embed.set_footer(text=f"Ton rang : #{rank} avec {value} coins")
+        await interaction.response.send_message(embed=embed)
+
+    @staticmethod
+    def _parse_bank_amount(montant):
+        """Montant d'un dépôt ou d'un retrait : None pour 'all' (résolu par la base), sinon un entier > 0."""
+        if montant.lower() == 'all':
+            return None
+        amount = int(montant)
+        if amount <= 0:
+            raise ValueError("Montant invalide.")
+        return amount
+
     @app_commands.command(name="deposit", description="Dépose de l'argent à la banque")
     @app_commands.describe(montant="Le montant à déposer (nombre ou 'all' pour tout déposer)")
     async def deposit(self, interaction: discord.Interaction, montant: str):
         """Dépose de l'argent à la banque. Utilise 'all' pour tout déposer."""
         try:
-            if montant.lower() == 'all':
-                balance = database.get_balance(interaction.user.id)
-                if balance <= 0:
-                    embed = discord.Embed(
-                        title="❌ Erreur",
-                        description="Tu n'as pas d'argent à déposer.",
-                        color=discord.Color.red()
-                    )
-                    await interaction.response.send_message(embed=embed)
-                    return
-                amount_to_deposit = balance
-            else:
-                amount_to_deposit = int(montant)
-                if amount_to_deposit <= 0:
-                    embed = discord.Embed(
-                        title="❌ Erreur",
-                        description="Montant invalide.",
-                        color=discord.Color.red()
-                    )
-                    await interaction.response.send_message(embed=embed)
-                    return
-
-            if database.get_balance(interaction.user.id) < amount_to_deposit:
-                embed = discord.Embed(
-                    title="❌ Erreur",
-                    description="Tu n'as pas assez d'argent dans ton portefeuille.",
-                    color=discord.Color.red()
-                )
-                await interaction.response.send_message(embed=embed)
-                return
+            amount = self._parse_bank_amount(montant)
+        except ValueError:
+            embed = discord.Embed(
+                title="❌ Erreur",
+                description="Montant invalide. Utilise un nombre ou 'all' pour tout déposer.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed)
+            return
 
-            database.deposit(interaction.user.id, amount_to_deposit)
+        result = await db.deposit(interaction.guild_id, interaction.user.id, amount)
+        if result.status is BankStatus.OK:
             embed = discord.Embed(
                 title="✅ Dépôt réussi",
-                description=f"Tu as déposé **{amount_to_deposit}** pièces à la banque.",
+                description=f"Tu as déposé **{result.amount}** pièces à la banque.",
                 color=discord.Color.green()
             )
-            await interaction.response.send_message(embed=embed)
-        except ValueError:
+        else:
             embed = discord.Embed(
                 title="❌ Erreur",
-                description="Montant invalide. Utilise un nombre ou 'all' pour tout déposer.",
+                description=(
+                    "Tu n'as pas d'argent à déposer." if result.status is BankStatus.EMPTY
+                    else "Tu n'as pas assez d'argent dans ton portefeuille."
+                ),
                 color=discord.Color.red()
             )
-            await interaction.response.send_message(embed=embed)
+        await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="withdraw", description="Retire de l'argent de la banque")
     @app_commands.describe(montant="Le montant à retirer (nombre ou 'all' pour tout retirer)")
     async def withdraw(self, interaction: discord.Interaction, montant: str):
         """Retire de l'argent de la banque. Utilise 'all' pour tout retirer."""
         try:
-            if montant.lower() == 'all':
-                deposit = database.get_deposit(interaction.user.id)
-                if deposit <= 0:
-                    embed = discord.Embed(
-                        title="❌ Erreur",
-                        description="Tu n'as pas d'argent à retirer.",
-                        color=discord.Color.red()
-                    )
-                    await interaction.response.send_message(embed=embed)
-                    return
-                amount_to_withdraw = deposit
-            else:
-                amount_to_withdraw = int(montant)
-                if amount_to_withdraw <= 0:
-                    embed = discord.Embed(
-                        title="❌ Erreur",
-                        description="Montant invalide.",
-                        color=discord.Color.red()
-                    )
-                    await interaction.response.send_message(embed=embed)
-                    return
-
-            if database.get_deposit(interaction.user.id) < amount_to_withdraw:
-                embed = discord.Embed(
-                    title="❌ Erreur",
-                    description="Tu n'as pas assez d'argent à la banque.",
-                    color=discord.Color.red()
-                )
-                await interaction.response.send_message(embed=embed)
-                return
+            amount = self._parse_bank_amount(montant)
+        except ValueError:
+            embed = discord.Embed(
+                title="❌ Erreur",
+                description="Montant invalide. Utilise un nombre ou 'all' pour tout retirer.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed)
+            return
 
-            database.withdraw(interaction.user.id, amount_to_withdraw)
+        result = await db.withdraw(interaction.guild_id, interaction.user.id, amount)
+        if result.status is BankStatus.OK:
             embed = discord.Embed(
                 title="✅ Retrait réussi",
-                description=f"Tu as retiré **{amount_to_withdraw}** pièces de la banque.",
+                description=f"Tu as retiré **{result.amount}** pièces de la banque.",
                 color=discord.Color.green()
             )
-            await interaction.response.send_message(embed=embed)
-        except ValueError:
+        else:
             embed = discord.Embed(
                 title="❌ Erreur",
-                description="Montant invalide. Utilise un nombre ou 'all' pour tout retirer.",
+                description=(
+                    "Tu n'as pas d'argent à retirer." if result.status is BankStatus.EMPTY
+                    else "Tu n'as pas assez d'argent à la banque."
+                ),
                 color=discord.Color.red()
             )
-            await interaction.response.send_message(embed=embed)
+        await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="pay", description="Paye un autre utilisateur")
     @app_commands.describe(membre="Le membre à payer", montant="Le montant à payer")
@@ -147,24 +168,13 @@ class Economy(commands.Cog):
             return
         
         try:
-            # On vérifie d'abord si l'utilisateur a assez d'argent
-            balance = database.get_balance(interaction.user.id)
-            if balance < montant:
-                embed = discord.Embed(
-                    title="❌ Erreur",
-                    description="Tu n'as pas assez d'argent dans ton portefeuille.",
-                    color=discord.Color.red()
-                )
-                await interaction.response.send_message(embed=embed)
-                return
-            
-            # Si tout est bon, on effectue le transfert
-            success = database.transfer_money(interaction.user.id, membre.id, montant)
+            # Le transfert vérifie le solde dans la même requête : False si l'argent manque
+            success = await db.transfer_money(interaction.guild_id, interaction.user.id, membre.id, montant)
             
             if not success:
                 embed = discord.Embed(
                     title="❌ Erreur",
-                    description="Le transfert a échoué.",
+                    description="Tu n'as pas assez d'argent dans ton portefeuille.",
                     color=discord.Color.red()
                 )
                 await interaction.response.send_message(embed=embed)
@@ -185,6 +195,48 @@ class Economy(commands.Cog):
             )
             await interaction.response.send_message(embed=embed)
             
+    @app_commands.command(name="giveaway", description="Distribue de l'argent à tous les membres d'un rôle")
+    @app_commands.describe(role="Le rôle dont les membres reçoivent l'argent", montant="Le montant versé à chaque membre")
+    async def giveaway(self, interaction: discord.Interaction, role: discord.Role, montant: app_commands.Range[int, 1]):
+        """Verse le même montant à chaque membre d'un rôle, depuis le portefeuille de l'utilisateur."""
+        recipients = [member.id for member in role.members if not member.bot and member.id != interaction.user.id]
+        if not recipients:
+            embed = discord.Embed(
+                title="❌ Erreur",
+                description=f"Aucun membre à payer dans le rôle **{role.name}**.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed)
+            return
+
+        total = montant * len(recipients)
+        try:
+            success = await db.transfer_money_bulk(interaction.guild_id, interaction.user.id, [(member_id, montant) for member_id in recipients])
+        except Exception as e:
+            embed = discord.Embed(
+                title="❌ Erreur inattendue",
+                description=f"Une erreur s'est produite : {str(e)}",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed)
+            return
+
+        if not success:
+            embed = discord.Embed(
+                title="❌ Erreur",
+                description=f"Il te faut **{total}** pièces dans ton portefeuille pour payer {len(recipients)} membres.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed)
+            return
+
+        embed = discord.Embed(
+            title="🎁 Giveaway",
+            description=f"{interaction.user.mention} a versé **{montant}** pièces à {len(recipients)} membres de **{role.name}** ({total} pièces au total).",
+            color=discord.Color.green()
+        )
+        await interaction.response.send_message(embed=embed)
+
     @app_commands.command(name="setbalance", description="[ADMIN] Change le solde d'un utilisateur")
     @app_commands.default_permissions(administrator=True)
     @app_commands.describe(membre="Le membre dont vous voulez modifier le solde", montant="Le nouveau solde")
@@ -198,7 +250,7 @@ class Economy(commands.Cog):
             )
             await interaction.response.send_message(embed=embed)
             return
-        database.set_balance(membre.id, montant)
+        await db.set_balance(interaction.guild_id, membre.id, montant)
         embed = discord.Embed(
             title="✅ Solde mis à jour",
             description=f"Le solde de {membre.display_name} a été mis à **{montant}** pièces.",
@@ -220,7 +272,7 @@ class Economy(commands.Cog):
             await interaction.response.send_message(embed=embed)
             return
         try:
-            database.add_money(membre.id, montant)
+            await db.add_money(interaction.guild_id, membre.id, montant)
             embed = discord.Embed(
                 title="✅ Argent ajouté",
                 description=f"**{montant}** pièces ont été ajoutées à {membre.display_name}.",
@@ -249,7 +301,7 @@ class Economy(commands.Cog):
             await interaction.response.send_message(embed=embed)
             return
         try:
-            database.remove_money(membre.id, montant)
+            await db.remove_money(interaction.guild_id, membre.id, montant)
             embed = discord.Embed(
                 title="✅ Argent retiré",
                 description=f"**{montant}** pièces ont été retirées de {membre.display_name}.",
@@ -271,6 +323,71 @@ class Economy(commands.Cog):
             )
             await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(name="bulk_money", description="[ADMIN] Ajoute, retire ou fixe l'argent de tout un rôle ou d'une liste de membres")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(
+        operation="L'opération à appliquer à chaque membre",
+        montant="Le montant (nouveau solde pour « Fixer le solde »)",
+        role="Le rôle dont tous les membres sont concernés",
+        membres="Mentions ou IDs des membres concernés, séparés par des espaces"
+    )
+    @app_commands.choices(operation=[
+        app_commands.Choice(name="Ajouter", value="add"),
+        app_commands.Choice(name="Retirer", value="remove"),
+        app_commands.Choice(name="Fixer le solde", value="set"),
+    ])
+    async def bulk_money(self, interaction: discord.Interaction, operation: app_commands.Choice[str], montant: int, role: discord.Role = None, membres: str = None):
+        """[ADMIN] Applique /add_money, /remove_money ou /setbalance à de nombreux membres en une seule transaction."""
+        user_ids = set()
+        ignored = []  # Entrées de `membres` qui ne désignent pas un membre du serveur (rôle, salon, bot, ID inconnu...)
+        if role is not None:
+            user_ids.update(member.id for member in role.members if not member.bot)
+        for entry in (membres or "").replace(",", " ").split():
+            match = MEMBER_ID_PATTERN.fullmatch(entry)
+            member = interaction.guild.get_member(int(match.group(1) or match.group(2))) if match else None
+            if member is None or member.bot:
+                ignored.append(entry)
+            else:
+                user_ids.add(member.id)
+        ignored_text = ", ".join(ignored[:MAX_IGNORED_SHOWN])[:900] + (f" (+{len(ignored) - MAX_IGNORED_SHOWN})" if len(ignored) > MAX_IGNORED_SHOWN else "")
+
+        if montant < 0 or (montant == 0 and operation.value != "set") or not user_ids:
+            if user_ids:
+                description = "Montant invalide."
+            elif ignored:
+                description = f"Aucun membre du serveur (hors bots) parmi les entrées données. Ignorées : {ignored_text}"
+            else:
+                description = "Aucun membre ciblé : indique un rôle et/ou une liste de membres."
+            embed = discord.Embed(title="❌ Erreur", description=description, color=discord.Color.red())
+            await interaction.response.send_message(embed=embed)
+            return
+
+        await interaction.response.defer(thinking=True)
+        started = time.monotonic()
+        try:
+            updated = await db.update_balances_bulk(interaction.guild_id, user_ids, montant, operation.value)
+        except Exception as e:
+            embed = discord.Embed(
+                title="❌ Erreur",
+                description=f"Une erreur s'est produite : {str(e)}",
+                color=discord.Color.red()
+            )
+            await interaction.followup.send(embed=embed)
+            return
+
+        embed = discord.Embed(
+            title=f"✅ {operation.name} : {montant} pièces",
+            description=f"{len(user_ids)} membres ciblés" + (f" (rôle **{role.name}**)" if role is not None else "") + ".",
+            color=discord.Color.green()
+        )
+        embed.add_field(name="Comptes modifiés", value=str(updated), inline=True)
+        if operation.value == "remove":
+            embed.add_field(name="Ignorés (solde insuffisant)", value=str(len(user_ids) - updated), inline=True)
+        embed.add_field(name="Durée", value=f"{time.monotonic() - started:.2f}s", inline=True)
+        if ignored:
+            embed.add_field(name=f"Entrées ignorées (bots ou non-membres du serveur) : {len(ignored)}", value=ignored_text, inline=False)
+        await interaction.followup.send(embed=embed)
+
     @app_commands.command(name="setsalary", description="[ADMIN] Attribue un salaire à un rôle")
     @app_commands.default_permissions(administrator=True)
     @app_commands.describe(role="Le rôle à qui attribuer un salaire", salaire="Le montant du salaire", cooldown="Le cooldown en secondes (par défaut 3600)")
@@ -285,7 +402,14 @@ class Economy(commands.Cog):
             await interaction.response.send_message(embed=embed)
             return
 
-        database.assign_role_salary(role.id, salaire, cooldown)
+        if not await db.assign_role_salary(interaction.guild_id, role.id, salaire, cooldown):
+            embed = discord.Embed(
+                title="❌ Erreur",
+                description=f"Le salaire du rôle **{role.name}** est enregistré pour un autre serveur et n'a pas été modifié.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed)
+            return
         embed = discord.Embed(
             title="✅ Salaire attribué",
             description=f"Le rôle **{role.name}** a maintenant un salaire de **{salaire}** pièces toutes les **{cooldown // 3600} heures**.",
@@ -298,7 +422,14 @@ class Economy(commands.Cog):
     @app_commands.describe(role="Le rôle dont vous voulez supprimer le salaire")
     async def removesalary(self, interaction: discord.Interaction, role: discord.Role):
         """[ADMIN] Supprime complètement le salaire d'un rôle."""
-        database.remove_role_salary(role.id)
+        if not await db.remove_role_salary(interaction.guild_id, role.id):
+            embed = discord.Embed(
+                title="❌ Erreur",
+                description=f"Le rôle **{role.name}** n'a pas de salaire sur ce serveur.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed)
+            return
         embed = discord.Embed(
             title="✅ Salaire supprimé",
             description=f"Le rôle **{role.name}** a été complètement supprimé de la liste des salaires.",
@@ -320,7 +451,14 @@ class Economy(commands.Cog):
             await interaction.response.send_message(embed=embed)
             return
 
-        database.assign_role_salary(role.id, salaire, cooldown)
+        if not await db.assign_role_salary(interaction.guild_id, role.id, salaire, cooldown):
+            embed = discord.Embed(
+                title="❌ Erreur",
+                description=f"Le salaire du rôle **{role.name}** est enregistré pour un autre serveur et n'a pas été modifié.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed)
+            return
         embed = discord.Embed(
             title="✅ Salaire modifié",
             description=f"Le rôle **{role.name}** a maintenant un salaire de **{salaire}** pièces toutes les **{cooldown // 3600} heures**.",
@@ -336,18 +474,14 @@ class Economy(commands.Cog):
         eligible_roles = []
         non_eligible_roles = []
 
-        conn = database.connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT last_collect FROM salary_cooldowns WHERE user_id = %s", (interaction.user.id,))
-        last_collect_result = cursor.fetchone()
-        last_collect = last_collect_result[0].timestamp() if last_collect_result else None
+        collected_at = await db.get_last_collect(interaction.guild_id, interaction.user.id)
+        last_collect = collected_at.timestamp() if collected_at else None
+
+        salaries = await db.get_roles_salaries(user_roles)
 
         for role_id in user_roles:
-            salary = database.get_role_salary(role_id)
-            if salary > 0:
-                cursor.execute("SELECT cooldown FROM role_salaries WHERE role_id = %s", (role_id,))
-                cooldown_result = cursor.fetchone()
-                cooldown = cooldown_result[0] if cooldown_result else 3600
+            if role_id in salaries:
+                salary, cooldown = salaries[role_id]
 
                 if last_collect:
                     remaining_time = (last_collect + cooldown) - time.time()
@@ -369,8 +503,6 @@ class Economy(commands.Cog):
                             f"**{role.name}** : {salary} pièces (cooldown : {hours}h {minutes}m {seconds}s)"
                         )
 
-        conn.close()
-
         if not eligible_roles:
             embed = discord.Embed(
                 title="❌ Aucun salaire disponible",
@@ -381,8 +513,14 @@ class Economy(commands.Cog):
             await interaction.response.send_message(embed=embed)
             return
 
-        database.update_balance(interaction.user.id, total_salary)
-        database.set_salary_cooldown(interaction.user.id)
+        if not await db.collect_salary(interaction.guild_id, interaction.user.id, total_salary, collected_at):
+            embed = discord.Embed(
+                title="❌ Salaire déjà collecté",
+                description="Ton salaire vient déjà d'être versé. Réessaie après le cooldown.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed)
+            return
 
         embed = discord.Embed(
             title="💰 Salaire collecté",
@@ -397,7 +535,7 @@ class Economy(commands.Cog):
     @app_commands.default_permissions(administrator=True)
     async def salaries(self, interaction: discord.Interaction):
         """[ADMIN] Affiche la liste de tous les rôles ayant un salaire dans le serveur."""
-        roles_salaries = database.get_all_roles_salaries()
+        roles_salaries = await db.get_all_roles_salaries(interaction.guild_id)
         if not roles_salaries:
             embed = discord.Embed(
                 title="📜 Salaires des rôles",
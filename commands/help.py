@@ -20,11 +20,13 @@ class HelpDropdown(discord.ui.Select):
             embed.add_field(name="/deposit <montant|all>", value="Dépose de l'argent à la banque. Utilise 'all' pour tout déposer.", inline=False)
             embed.add_field(name="/withdraw <montant|all>", value="Retire de l'argent de la banque. Utilise 'all' pour tout retirer.", inline=False)
             embed.add_field(name="/pay <membre> <montant>", value="Paye un autre utilisateur.", inline=False)
+            embed.add_field(name="/giveaway <rôle> <montant>", value="Verse le même montant à chaque membre d'un rôle, depuis ton portefeuille.", inline=False)
             embed.add_field(name="/collect", value="Collecte ton salaire en fonction de tes rôles.", inline=False)
+            embed.add_field(name="/leaderboard [classement]", value="Affiche les membres les plus riches (fortune totale, poche ou banque) et ton rang.", inline=False)
 
         elif category == "Inventaire":
             embed = discord.Embed(title="📦 Commandes Inventaire", color=discord.Color.orange())
-            embed.add_field(name="/inventaire", value="Affiche ton inventaire.", inline=False)
+            embed.add_field(name="/inventaire [tri]", value="Affiche ton inventaire page par page, trié par shop ou par quantité.", inline=False)
 
         elif category == "Boutique":
             embed = discord.Embed(title="🛒 Commandes Boutique", color=discord.Color.blue())
@@ -39,17 +41,21 @@ class HelpDropdown(discord.ui.Select):
             embed.add_field(name="/setbalance <membre> <montant>", value="Change le solde d'un utilisateur.", inline=False)
             embed.add_field(name="/add_money <membre> <montant>", value="Ajoute de l'argent à un utilisateur.", inline=False)
             embed.add_field(name="/remove_money <membre> <montant>", value="Retire de l'argent à un utilisateur.", inline=False)
+            embed.add_field(name="/bulk_money <opération> <montant> [rôle] [membres]", value="Ajoute, retire ou fixe l'argent de tout un rôle ou d'une liste de membres.", inline=False)
             embed.add_field(name="/additem <membre> <nom_item> <quantité>", value="Ajoute un item à l'inventaire d'un utilisateur.", inline=False)
             embed.add_field(name="/removeitem <membre> <nom_item> <quantité>", value="Retire un item de l'inventaire d'un utilisateur.", inline=False)
             embed.add_field(name="/setsalary <rôle> <salaire> <cooldown>", value="Attribue un salaire à un rôle.", inline=False)
             embed.add_field(name="/removesalary <rôle>", value="Supprime le salaire d'un rôle.", inline=False)
             embed.add_field(name="/editsalary <rôle> <salaire> <cooldown>", value="Modifie le salaire et le cooldown d'un rôle.", inline=False)
             embed.add_field(name="/salaries", value="Affiche la liste des rôles avec un salaire attribué.", inline=False)
+            embed.add_field(name="/payroll_status", value="Affiche l'état du versement automatique des salaires.", inline=False)
             embed.add_field(name="/create_shop <nom> <description>", value="Crée un nouveau shop.", inline=False)
             embed.add_field(name="/delete_shop <shop_id>", value="Supprime un shop.", inline=False)
             embed.add_field(name="/add_item <shop_id> <nom> <prix> <stock> <description>", value="Ajoute un item à un shop.", inline=False)
             embed.add_field(name="/remove_item <item_id>", value="Supprime un item d'un shop.", inline=False)
             embed.add_field(name="/reactivate_item <item_id> <stock>", value="Réactive un item inactif.", inline=False)
+            embed.add_field(name="/import_items <fichier> [remplacer]", value="Importe des items en masse depuis un CSV ou un JSON.", inline=False)
+            embed.add_field(name="/export_items [shop_id]", value="Exporte les items en CSV.", inline=False)
 
         await interaction.response.edit_message(embed=embed, view=None)
 
@@ -1,19 +1,28 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import database
+from async_database import db
+from commands._pagination import PaginatorView
+
+INVENTORY_PAGE_SIZE = 10  # Items par page de /inventaire (un embed accepte au plus 25 champs)
 
 class Inventory(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
     @app_commands.command(name="inventaire", description="Affiche ton inventaire")
-    async def inventaire(self, interaction: discord.Interaction):
-        """Affiche l'inventaire de l'utilisateur en utilisant une commande slash"""
+    @app_commands.describe(tri="L'ordre d'affichage des items (défaut: par shop)")
+    @app_commands.choices(tri=[
+        app_commands.Choice(name="Par shop", value="shop"),
+        app_commands.Choice(name="Par quantité", value="quantity"),
+    ])
+    async def inventaire(self, interaction: discord.Interaction, tri: app_commands.Choice[str] = None):
+        """Affiche l'inventaire de l'utilisateur, page par page"""
+        sort = tri.value if tri else "shop"
         try:
-            inventory = database.get_user_inventory(interaction.user.id)
+            distinct_items, total_quantity = await db.get_user_inventory_summary(interaction.guild_id, interaction.user.id)
             
-            if not inventory:
+            if not distinct_items:
                 embed = discord.Embed(
                     title="📦 Inventaire",
                     description="Ton inventaire est vide.",
@@ -22,29 +31,32 @@ class Inventory(commands.Cog):
                 await interaction.response.send_message(embed=embed)
                 return
 
-            embed = discord.Embed(
-                title=f"📦 Inventaire de {interaction.user.display_name}",
-                color=discord.Color.gold()
-            )
-            
-            for item in inventory:
-                if len(item) == 3:
-                    item_name, quantity, shop_name = item
+            def render_page(rows, page_number):
+                embed = discord.Embed(
+                    title=f"📦 Inventaire de {interaction.user.display_name} - Page {page_number}/{-(-distinct_items // INVENTORY_PAGE_SIZE)}",
+                    description=f"{distinct_items} items différents, {total_quantity} objets au total",
+                    color=discord.Color.gold()
+                )
+                for item_name, quantity, shop_name, _, _ in rows:
                     embed.add_field(
                         name=item_name,
                         value=f"Quantité : {quantity} (Shop: {shop_name})",
                         inline=False
                     )
-                else:
-                    embed = discord.Embed(
-                        title="❌ Erreur",
-                        description="Une erreur s'est produite : format d'inventaire invalide.",
-                        color=discord.Color.red()
-                    )
-                    await interaction.response.send_message(embed=embed)
-                    return
+                return embed
 
-            await interaction.response.send_message(embed=embed)
+            view = PaginatorView(
+                interaction.user.id,
+                lambda after, limit: db.get_user_inventory_page(interaction.guild_id, interaction.user.id, sort, after, limit),
+                lambda row: (row[1], row[3], row[4]),  # (quantity, shop_id, item_id)
+                render_page,
+                items_per_page=INVENTORY_PAGE_SIZE
+            )
+            await view.start(interaction, discord.Embed(
+                title="📦 Inventaire",
+                description="Ton inventaire est vide.",
+                color=discord.Color.orange()
+            ))
         except Exception as e:
             embed = discord.Embed(
                 title="❌ Erreur",
@@ -69,7 +81,7 @@ class Inventory(commands.Cog):
     ):
         """Commande slash pour ajouter un item à l'inventaire"""
         try:
-            item_data = database.get_item_by_name(item_name)
+            item_data = await db.get_item_by_name(interaction.guild_id, item_name)
             if not item_data:
                 embed = discord.Embed(
                     title="❌ Erreur",
@@ -89,7 +101,7 @@ class Inventory(commands.Cog):
                 await interaction.response.send_message(embed=embed)
                 return
 
-            item_details = database.get_item_by_id(item_id)
+            item_details = await db.get_item_by_id(interaction.guild_id, item_id)
             if not item_details:
                 embed = discord.Embed(
                     title="❌ Erreur",
@@ -100,7 +112,7 @@ class Inventory(commands.Cog):
                 return
 
             shop_id = item_details[1]
-            database.add_user_item(member.id, shop_id, item_id, quantity)
+            await db.add_user_item(interaction.guild_id, member.id, shop_id, item_id, quantity)
             embed = discord.Embed(
                 title="✅ Item ajouté",
                 description=f"{quantity}x **{item_name}** ont été ajoutés à l'inventaire de {member.mention}.",
@@ -131,7 +143,7 @@ class Inventory(commands.Cog):
     ):
         """Commande slash pour retirer un item de l'inventaire"""
         try:
-            item_data = database.get_item_by_name(item_name)
+            item_data = await db.get_item_by_name(interaction.guild_id, item_name)
             if not item_data:
                 embed = discord.Embed(
                     title="❌ Erreur",
@@ -142,7 +154,7 @@ class Inventory(commands.Cog):
                 return
 
             item_id = item_data[0]
-            item_details = database.get_item_by_id(item_id)
+            item_details = await db.get_item_by_id(interaction.guild_id, item_id)
             if not item_details:
                 embed = discord.Embed(
                     title="❌ Erreur",
@@ -153,7 +165,7 @@ class Inventory(commands.Cog):
                 return
 
             shop_id = item_details[1]
-            database.remove_user_item(member.id, shop_id, item_id, quantity)
+            await db.remove_user_item(interaction.guild_id, member.id, shop_id, item_id, quantity)
             embed = discord.Embed(
                 title="✅ Item retiré",
                 description=f"{quantity}x **{item_name}** ont été retirés de l'inventaire de {member.mention}.",
@@ -0,0 +1,148 @@
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+from async_database import db
+import os
+import time
+
+# Versement automatique des salaires (désactivé par défaut)
+PAYROLL_ENABLED = os.getenv('PAYROLL_ENABLED', '0') == '1'
+PAYROLL_INTERVAL = float(os.getenv('PAYROLL_INTERVAL', 600))  # Secondes entre deux passages
+PAYROLL_CHUNK_SIZE = int(os.getenv('PAYROLL_CHUNK_SIZE', 1000))  # Membres crédités par requête
+PAYROLL_MAX_PER_RUN = int(os.getenv('PAYROLL_MAX_PER_RUN', 20000))  # Membres payés au maximum par passage
+
+class Payroll(commands.Cog):
+    """Verse périodiquement les salaires des rôles à tous les membres dont le cooldown est écoulé."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.metrics = {
+            "runs": 0,
+            "running": False,
+            "last_run_at": None,
+            "last_duration": 0.0,
+            "last_candidates": 0,
+            "last_due": 0,
+            "last_paid": 0,
+            "last_amount": 0,
+            "last_capped": False,
+            "chunks_done": 0,
+            "chunks_total": 0,
+            "total_paid": 0,
+            "total_amount": 0,
+            "errors": 0,
+        }
+
+    async def cog_load(self):
+        if PAYROLL_ENABLED:
+            self.payroll_loop.start()
+
+    async def cog_unload(self):
+        self.payroll_loop.cancel()
+
+    @tasks.loop(seconds=PAYROLL_INTERVAL)
+    async def payroll_loop(self):
+        try:
+            await self.run_payroll()
+        except Exception as e:
+            self.metrics["errors"] += 1
+            print(f"Erreur lors du versement automatique des salaires : {e}")
+
+    @payroll_loop.before_loop
+    async def before_payroll(self):
+        await self.bot.wait_until_ready()
+
+    async def collect_due(self, guild):
+        """Calcule, à partir du cache des membres, le salaire dû à chaque membre : [(user_id, montant, last_collect)]."""
+        salaries = await db.get_roles_salaries([role.id for role in guild.roles])
+        if not salaries:
+            return 0, []
+
+        member_roles = {}
+        for role in guild.roles:
+            if role.id in salaries:
+                for member in role.members:
+                    if not member.bot:
+                        member_roles.setdefault(member.id, []).append(role.id)
+
+        last_collects = {}
+        user_ids = list(member_roles)
+        for i in range(0, len(user_ids), PAYROLL_CHUNK_SIZE):
+            last_collects.update(await db.get_last_collects(guild.id, user_ids[i:i + PAYROLL_CHUNK_SIZE]))
+
+        now = time.time()
+        due = []
+        for user_id, role_ids in member_roles.items():
+            last_collect = last_collects.get(user_id)
+            total = 0
+            for role_id in role_ids:
+                salary, cooldown = salaries[role_id]
+                if last_collect is None or last_collect.timestamp() + cooldown <= now:
+                    total += salary
+            if total > 0:
+                due.append((user_id, total, last_collect))
+        return len(member_roles), due
+
+    async def run_payroll(self):
+        """Un passage complet : calcule les salaires dus puis les verse par lots."""
+        started = time.monotonic()
+        metrics = self.metrics
+        metrics["running"] = True
+        try:
+            candidates = 0
+            due_count = 0
+            remaining = PAYROLL_MAX_PER_RUN
+            chunks = []  # [(guild_id, lot)] : chaque serveur a ses propres comptes
+            for guild in self.bot.guilds:
+                guild_candidates, guild_due = await self.collect_due(guild)
+                candidates += guild_candidates
+                due_count += len(guild_due)
+                guild_due = guild_due[:remaining]
+                remaining -= len(guild_due)
+                chunks.extend((guild.id, guild_due[i:i + PAYROLL_CHUNK_SIZE]) for i in range(0, len(guild_due), PAYROLL_CHUNK_SIZE))
+
+            metrics["last_candidates"] = candidates
+            metrics["last_due"] = due_count
+            metrics["last_capped"] = due_count > PAYROLL_MAX_PER_RUN
+
+            metrics["chunks_total"] = len(chunks)
+            metrics["chunks_done"] = 0
+            metrics["last_paid"] = 0
+            metrics["last_amount"] = 0
+            for guild_id, chunk in chunks:
+                paid, amount = await db.pay_salaries(guild_id, chunk)
+                metrics["chunks_done"] += 1
+                metrics["last_paid"] += paid
+                metrics["last_amount"] += amount
+                metrics["total_paid"] += paid
+                metrics["total_amount"] += amount
+        finally:
+            metrics["running"] = False
+            metrics["runs"] += 1
+            metrics["last_run_at"] = discord.utils.utcnow()
+            metrics["last_duration"] = time.monotonic() - started
+
+    @app_commands.command(name="payroll_status", description="[ADMIN] Affiche l'état du versement automatique des salaires")
+    @app_commands.default_permissions(administrator=True)
+    async def payroll_status(self, interaction: discord.Interaction):
+        """[ADMIN] Affiche l'état du versement automatique des salaires."""
+        m = self.metrics
+        embed = discord.Embed(
+            title="🏦 Versement automatique des salaires",
+            description="✅ Activé" if PAYROLL_ENABLED else "⏸️ Désactivé (PAYROLL_ENABLED=1 pour l'activer)",
+            color=discord.Color.blue()
+        )
+        last_run = discord.utils.format_dt(m["last_run_at"], "R") if m["last_run_at"] else "Jamais"
+        embed.add_field(name="Dernier passage", value=f"{last_run} en {m['last_duration']:.2f}s", inline=False)
+        embed.add_field(name="Progression", value=f"{m['chunks_done']}/{m['chunks_total']} lots" + (" (en cours)" if m["running"] else ""), inline=True)
+        embed.add_field(
+            name="Dernier résultat",
+            value=f"{m['last_paid']} payés sur {m['last_due']} dus ({m['last_candidates']} membres salariés)\n"
+                  f"💰 {m['last_amount']} pièces" + ("\n⚠️ Plafond par passage atteint" if m["last_capped"] else ""),
+            inline=False
+        )
+        embed.add_field(name="Total", value=f"{m['runs']} passages, {m['total_paid']} versements, {m['total_amount']} pièces, {m['errors']} erreurs", inline=False)
+        await interaction.response.send_message(embed=embed)
+
+async def setup(bot):
+    await bot.add_cog(Payroll(bot))
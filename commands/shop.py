@@ -1,124 +1,84 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from discord.ui import Button, View
-import database
+from async_database import db
+from database import PurchaseStatus, SaleStatus
+from catalogue_io import parse_catalogue
+from commands._pagination import PaginatorView
 import asyncio
+import os
+import tempfile
+
+CATALOGUE_IMPORT_MAX_ROWS = int(os.getenv('CATALOGUE_IMPORT_MAX_ROWS', 50000))  # Items max par fichier importé
+CATALOGUE_EXPORT_MEMORY = 5 * 1024 * 1024  # Au-delà, l'export est écrit sur disque plutôt qu'en mémoire
 
 class Shop(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    class PaginatorView(View):
-        def __init__(self, author_id, pages, timeout=60):
-            super().__init__(timeout=timeout)
-            self.author_id = author_id
-            self.pages = pages
-            self.current_page = 0
-
-            # Boutons précédent/suivant
-            self.prev_button = Button(emoji="⬅️", style=discord.ButtonStyle.blurple)
-            self.next_button = Button(emoji="➡️", style=discord.ButtonStyle.blurple)
-            
-            self.prev_button.callback = self.previous_page
-            self.next_button.callback = self.next_page
-            
-            self.add_item(self.prev_button)
-            self.add_item(self.next_button)
-            self.update_buttons()
-
-        def update_buttons(self):
-            self.prev_button.disabled = self.current_page == 0
-            self.next_button.disabled = self.current_page == len(self.pages) - 1
-
-        async def previous_page(self, interaction: discord.Interaction):
-            if interaction.user.id != self.author_id:
-                return await interaction.response.send_message("Seul l'auteur peut interagir.", ephemeral=True)
-            
-            self.current_page = max(0, self.current_page - 1)
-            self.update_buttons()
-            await interaction.response.edit_message(embed=self.pages[self.current_page], view=self)
-
-        async def next_page(self, interaction: discord.Interaction):
-            if interaction.user.id != self.author_id:
-                return await interaction.response.send_message("Seul l'auteur peut interagir.", ephemeral=True)
-            
-            self.current_page = min(len(self.pages) - 1, self.current_page + 1)
-            self.update_buttons()
-            await interaction.response.edit_message(embed=self.pages[self.current_page], view=self)
-
-        async def on_timeout(self):
-            # Désactive les boutons quand le timeout est atteint
-            for item in self.children:
-                item.disabled = True
-            try:
-                await self.message.edit(view=self)
-            except:
-                pass
-
-    async def send_paginated(self, interaction: discord.Interaction, data, title: str, color: discord.Color, items_per_page: int = 5):
-        """Envoie un message paginé avec les données"""
-        if not data:
-            return await interaction.response.send_message(
-                embed=discord.Embed(
-                    title=title,
-                    description="Aucun élément trouvé.",
-                    color=color
-                ),
-                ephemeral=True
-            )
-
-        # Tri par prix si ce sont des items
-        if len(data) > 0 and len(data[0]) >= 5:
-            data = sorted(data, key=lambda x: x[2])  # x[2] = prix
-
-        pages = []
-        total_pages = ((len(data) - 1) // items_per_page) + 1
-        
-        for i in range(0, len(data), items_per_page):
-            embed = discord.Embed(
-                title=f"{title} - Page {i//items_per_page + 1}/{total_pages}",
-                color=color
-            )
-            
-            for item in data[i:i + items_per_page]:
-                if len(item) == 3:  # Format shop
-                    shop_id, name, description = item
-                    embed.add_field(
-                        name=f"{name} (ID: {shop_id})",
-                        value=f"📖 {description[:200] + ('...' if len(description) > 200 else '')}",
-                        inline=False
-                    )
-                elif len(item) >= 5:  # Format item
-                    item_id, name, price, description, stock = item[:5]
-                    stock_display = "∞" if stock == -1 else stock
-                    embed.add_field(
-                        name=f"{name} (ID: {item_id})",
-                        value=f"💰 Prix: {price} pièces\n📖 {description[:200]}\n📦 Stock: {stock_display}",
-                        inline=False
-                    )
-            
-            pages.append(embed)
-
-        if len(pages) == 1:
-            return await interaction.response.send_message(embed=pages[0])
+    @staticmethod
+    def render_page(rows, page_number, title: str, color: discord.Color):
+        """Construit l'embed d'une page de shops ou d'items."""
+        embed = discord.Embed(
+            title=f"{title} - Page {page_number}",
+            color=color
+        )
         
-        view = self.PaginatorView(interaction.user.id, pages)
-        await interaction.response.send_message(embed=pages[0], view=view)
-        view.message = await interaction.original_response()
+        for item in rows:
+            if len(item) == 3:  # Format shop
+                shop_id, name, description = item
+                embed.add_field(
+                    name=f"{name} (ID: {shop_id})",
+                    value=f"📖 {description[:200] + ('...' if len(description) > 200 else '')}",
+                    inline=False
+                )
+            elif len(item) >= 5:  # Format item
+                item_id, name, price, description, stock = item[:5]
+                stock_display = "∞" if stock == -1 else stock
+                embed.add_field(
+                    name=f"{name} (ID: {item_id})",
+                    value=f"💰 Prix: {price} pièces\n📖 {description[:200]}\n📦 Stock: {stock_display}",
+                    inline=False
+                )
+        return embed
+
+    async def send_paginated(self, interaction: discord.Interaction, fetch_page, page_key, title: str, color: discord.Color, items_per_page: int = 5):
+        """Envoie un message paginé dont les pages sont lues en base au fil de la navigation"""
+        view = PaginatorView(
+            interaction.user.id,
+            fetch_page,
+            page_key,
+            lambda rows, page_number: self.render_page(rows, page_number, title, color),
+            items_per_page=items_per_page
+        )
+        await view.start(interaction, discord.Embed(
+            title=title,
+            description="Aucun élément trouvé.",
+            color=color
+        ))
 
     @app_commands.command(name="shops", description="Liste tous les magasins disponibles")
     async def shops(self, interaction: discord.Interaction):
         """Liste tous les magasins"""
-        shops = database.get_shops()
-        await self.send_paginated(interaction, shops, "🏪 Liste des magasins", discord.Color.blue())
+        await self.send_paginated(
+            interaction,
+            lambda after, limit: db.get_shops_page(interaction.guild_id, after, limit),
+            lambda shop: shop[0],
+            "🏪 Liste des magasins",
+            discord.Color.blue()
+        )
 
     @app_commands.command(name="shop", description="Affiche les articles d'un magasin spécifique")
     @app_commands.describe(shop_id="L'ID du magasin à consulter")
     async def shop(self, interaction: discord.Interaction, shop_id: int):
-        """Affiche les articles d'un magasin"""
-        items = database.get_shop_items(shop_id)
-        await self.send_paginated(interaction, items, f"🛍️ Magasin #{shop_id}", discord.Color.green())
+        """Affiche les articles d'un magasin, triés par prix"""
+        await self.send_paginated(
+            interaction,
+            lambda after, limit: db.get_shop_items_page(interaction.guild_id, shop_id, after, limit),
+            lambda item: (item[2], item[0]),  # (prix, item_id)
+            f"🛍️ Magasin #{shop_id}",
+            discord.Color.green()
+        )
 
     @app_commands.command(name="create_shop", description="Créer un nouveau shop (Admin)")
     @app_commands.default_permissions(administrator=True)
@@ -127,7 +87,7 @@ class Shop(commands.Cog):
         description="La description du shop"
     )
     async def create_shop(self, interaction: discord.Interaction, name: str, description: str):
-        shop_id = database.create_shop(name, description)
+        shop_id = await db.create_shop(interaction.guild_id, name, description)
         embed = discord.Embed(
             title="🏪 Nouveau Shop créé",
             description=f"Nom: {name}\nDescription: {description}\nID: {shop_id}",
@@ -139,7 +99,7 @@ class Shop(commands.Cog):
     @app_commands.default_permissions(administrator=True)
     @app_commands.describe(shop_id="L'ID du shop à supprimer")
     async def delete_shop(self, interaction: discord.Interaction, shop_id: int):
-        success = database.delete_shop(shop_id)
+        success = await db.delete_shop(interaction.guild_id, shop_id)
         if success:
             embed = discord.Embed(title="🗑️ Shop Supprimé", 
                                 description=f"Le shop ID {shop_id} a été supprimé.", 
@@ -160,7 +120,7 @@ class Shop(commands.Cog):
         description="La description de l'item"
     )
     async def add_item(self, interaction: discord.Interaction, shop_id: int, name: str, price: app_commands.Range[int, 1], stock: int = -1, description: str = ""):
-        item_id = database.add_item_to_shop(shop_id, name, price, description, stock)
+        item_id = await db.add_item_to_shop(interaction.guild_id, shop_id, name, price, description, stock)
         stock_display = "∞" if stock == -1 else str(stock)
         embed = discord.Embed(
             title="🛍️ Nouvel Item ajouté",
@@ -169,6 +129,77 @@ class Shop(commands.Cog):
         )
         await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(name="import_items", description="Importer des items en masse depuis un fichier CSV ou JSON (Admin seulement)")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(
+        fichier="Fichier .csv (colonnes shop_id,name,price,description,stock,active) ou .json (liste d'objets)",
+        remplacer="Mettre à jour les items qui existent déjà dans le shop (défaut: ignorés)"
+    )
+    async def import_items(self, interaction: discord.Interaction, fichier: discord.Attachment, remplacer: bool = False):
+        """Importe un catalogue d'items pour un ou plusieurs shops en une seule transaction."""
+        if not fichier.filename.lower().endswith((".csv", ".json")):
+            return await interaction.response.send_message(embed=discord.Embed(
+                title="❌ Format non supporté",
+                description="Le fichier doit être un .csv ou un .json.",
+                color=discord.Color.red()
+            ), ephemeral=True)
+
+        await interaction.response.defer(thinking=True)
+        try:
+            data = await fichier.read()
+            rows, errors = await asyncio.to_thread(parse_catalogue, data, fichier.filename, CATALOGUE_IMPORT_MAX_ROWS)
+            if errors:
+                shown = "\n".join(errors[:10]) + (f"\n… et {len(errors) - 10} autre(s) erreur(s)" if len(errors) > 10 else "")
+                return await interaction.followup.send(embed=discord.Embed(
+                    title="❌ Import refusé",
+                    description=f"Aucun item n'a été importé.\n```{shown[:3900]}```",
+                    color=discord.Color.red()
+                ))
+            created, updated, skipped = await db.import_catalogue(interaction.guild_id, rows, remplacer)
+        except ValueError as e:
+            return await interaction.followup.send(embed=discord.Embed(
+                title="❌ Import refusé",
+                description=str(e),
+                color=discord.Color.red()
+            ))
+        except Exception as e:
+            print(f"Erreur lors de l'import du catalogue : {e}")
+            return await interaction.followup.send(embed=discord.Embed(
+                title="❌ Erreur lors de l'import",
+                description="Une erreur s'est produite : aucun item n'a été importé. Veuillez réessayer.",
+                color=discord.Color.red()
+            ))
+
+        embed = discord.Embed(
+            title="📥 Import terminé",
+            description=f"{len(rows)} items lus dans **{fichier.filename}**.",
+            color=discord.Color.green()
+        )
+        embed.add_field(name="Créés", value=str(created), inline=True)
+        embed.add_field(name="Mis à jour", value=str(updated), inline=True)
+        embed.add_field(name="Ignorés (déjà existants)", value=str(skipped), inline=True)
+        await interaction.followup.send(embed=embed)
+
+    @app_commands.command(name="export_items", description="Exporter les items en CSV, réimportable avec /import_items (Admin seulement)")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(shop_id="L'ID du shop à exporter (tous les shops si absent)")
+    async def export_items(self, interaction: discord.Interaction, shop_id: int = None):
+        """Exporte le catalogue au format CSV."""
+        await interaction.response.defer(thinking=True)
+        try:
+            with tempfile.SpooledTemporaryFile(max_size=CATALOGUE_EXPORT_MEMORY) as export:
+                await db.export_catalogue(interaction.guild_id, export, [shop_id] if shop_id is not None else None)
+                export.seek(0)
+                filename = f"items_shop_{shop_id}.csv" if shop_id is not None else "items.csv"
+                await interaction.followup.send(content="📤 Export du catalogue :", file=discord.File(export, filename=filename))
+        except Exception as e:
+            print(f"Erreur lors de l'export du catalogue : {e}")
+            await interaction.followup.send(embed=discord.Embed(
+                title="❌ Erreur lors de l'export",
+                description="Une erreur s'est produite pendant l'export du catalogue. Veuillez réessayer.",
+                color=discord.Color.red()
+            ))
+
     @app_commands.command(name="acheter", description="Acheter un item par son nom")
     @app_commands.describe(
         shop_id="L'ID du shop où acheter",
@@ -176,64 +207,50 @@ class Shop(commands.Cog):
         quantity="La quantité à acheter (défaut: 1)"
     )
     async def acheter(self, interaction: discord.Interaction, shop_id: int, item_name: str, quantity: app_commands.Range[int, 1] = 1):
-        item = database.get_item_by_name(item_name)
-        
-        if not item:
+        try:
+            result = await db.purchase_item(interaction.guild_id, interaction.user.id, shop_id, item_name, quantity)
+        except Exception as e:
             await interaction.response.send_message(embed=discord.Embed(
-                title="❌ Item introuvable",
-                description=f"Aucun item nommé **{item_name}** n'a été trouvé.",
+                title="❌ Erreur lors de l'achat",
+                description=f"Une erreur s'est produite lors de l'achat de **{item_name}**. Veuillez réessayer.",
                 color=discord.Color.red()
             ))
+            print(f"Erreur lors de l'achat : {e}")
             return
 
-        item_id, name, price, description, stock, active = item
-
-        if active != 1:
-            await interaction.response.send_message(embed=discord.Embed(
+        name = result.name
+        if result.status is PurchaseStatus.NOT_FOUND:
+            embed = discord.Embed(
+                title="❌ Item introuvable",
+                description=f"Aucun item nommé **{item_name}** n'a été trouvé dans le shop #{shop_id}.",
+                color=discord.Color.red()
+            )
+        elif result.status is PurchaseStatus.INACTIVE:
+            embed = discord.Embed(
                 title="❌ Item inactif",
                 description=f"L'item **{name}** n'est pas disponible à l'achat.",
                 color=discord.Color.red()
-            ))
-            return
-
-        if stock != -1 and stock < quantity:
-            await interaction.response.send_message(embed=discord.Embed(
+            )
+        elif result.status is PurchaseStatus.OUT_OF_STOCK:
+            embed = discord.Embed(
                 title="❌ Stock insuffisant",
-                description=f"Il ne reste que {stock} unités de **{name}**.",
+                description=f"Il ne reste que {result.stock} unités de **{name}**.",
                 color=discord.Color.red()
-            ))
-            return
-
-        total_cost = price * quantity
-        user_balance = database.get_balance(interaction.user.id)
-        if user_balance < total_cost:
-            await interaction.response.send_message(embed=discord.Embed(
+            )
+        elif result.status is PurchaseStatus.INSUFFICIENT_FUNDS:
+            embed = discord.Embed(
                 title="❌ Solde insuffisant",
                 description=f"Tu n'as pas assez d'argent pour acheter {quantity}x **{name}**.",
                 color=discord.Color.red()
-            ))
-            return
-
-        try:
-            database.update_balance(interaction.user.id, -total_cost)
-            database.add_user_item(interaction.user.id, shop_id, item_id, quantity)
-            
-            if stock != -1:
-                database.decrement_item_stock(shop_id, item_id, quantity)
-
-            await interaction.response.send_message(embed=discord.Embed(
+            )
+        else:
+            embed = discord.Embed(
                 title="✅ Achat réussi",
-                description=f"{interaction.user.mention} a acheté {quantity}x **{name}** pour **{total_cost}** pièces.",
+                description=f"{interaction.user.mention} a acheté {quantity}x **{name}** pour **{result.total_cost}** pièces.",
                 color=discord.Color.green()
-            ))
-        except Exception as e:
-            await interaction.response.send_message(embed=discord.Embed(
-                title="❌ Erreur lors de l'achat",
-                description=f"Une erreur s'est produite lors de l'achat de **{name}**. Veuillez réessayer.",
-                color=discord.Color.red()
-            ))
-            print(f"Erreur lors de l'achat : {e}")
-            
+            )
+        await interaction.response.send_message(embed=embed)
+
     @app_commands.command(name="vendre", description="Vendre un item")
     @app_commands.describe(
         shop_id="L'ID du shop d'origine de l'item",
@@ -241,40 +258,43 @@ class Shop(commands.Cog):
         quantity="La quantité à vendre (défaut: 1)"
     )
     async def vendre(self, interaction: discord.Interaction, shop_id: int, item_name: str, quantity: app_commands.Range[int, 1] = 1):
-        item = database.get_item_by_name(item_name)
-        if not item:
+        try:
+            result = await db.sell_item(interaction.guild_id, interaction.user.id, shop_id, item_name, quantity)
+        except Exception as e:
             await interaction.response.send_message(embed=discord.Embed(
-                title="❌ Item introuvable",
-                description=f"Aucun item nommé **{item_name}**.",
+                title="❌ Erreur lors de la vente",
+                description=f"Une erreur s'est produite lors de la vente de **{item_name}**. Veuillez réessayer.",
                 color=discord.Color.red()
             ))
+            print(f"Erreur lors de la vente : {e}")
             return
 
-        item_id, name, price = item[0], item[1], int(item[2] * 0.8)
-        total_earned = price * quantity
+        if result.status is SaleStatus.NOT_FOUND:
+            await interaction.response.send_message(embed=discord.Embed(
+                title="❌ Item introuvable",
+                description=f"Aucun item nommé **{item_name}** dans le shop #{shop_id}.",
+                color=discord.Color.red()
+            ))
+            return
 
-        inventory = database.get_user_inventory(interaction.user.id)
-        user_has_item = any(i[0] == name and i[1] >= quantity for i in inventory)
-        if not user_has_item:
+        if result.status is SaleStatus.INSUFFICIENT_QUANTITY:
             await interaction.response.send_message(embed=discord.Embed(
                 title="❌ Quantité insuffisante",
-                description=f"Tu ne possèdes pas {quantity}x **{name}**.",
+                description=f"Tu ne possèdes pas {quantity}x **{result.name}**.",
                 color=discord.Color.red()
             ))
             return
 
-        database.remove_user_item(interaction.user.id, shop_id, item_id, quantity)
-        database.update_balance(interaction.user.id, total_earned)
         await interaction.response.send_message(embed=discord.Embed(
             title="💰 Vente réussie",
-            description=f"{interaction.user.mention} a vendu {quantity}x **{name}** pour **{total_earned}** pièces.",
+            description=f"{interaction.user.mention} a vendu {quantity}x **{result.name}** pour **{result.total_earned}** pièces.",
             color=discord.Color.blue()
         ))
         
     @app_commands.command(name="item_info", description="Afficher les informations détaillées d'un item")
     @app_commands.describe(name="Le nom de l'item à rechercher")
     async def item_info(self, interaction: discord.Interaction, name: str):
-        item = database.get_item_by_name(name)
+        item = await db.get_item_by_name(interaction.guild_id, name)
         if not item:
             await interaction.response.send_message(embed=discord.Embed(
                 title="❌ Introuvable", 
@@ -302,7 +322,7 @@ class Shop(commands.Cog):
         stock="Le nouveau stock (optionnel)"
     )
     async def reactivate_item(self, interaction: discord.Interaction, item_id: int, stock: int = None):
-        item = database.get_item_by_id(item_id)
+        item = await db.get_item_by_id(interaction.guild_id, item_id)
         if not item:
             await interaction.response.send_message(embed=discord.Embed(
                 title="❌ Erreur", 
@@ -311,7 +331,7 @@ class Shop(commands.Cog):
             ))
             return
 
-        database.reactivate_item(item_id, stock)
+        await db.reactivate_item(interaction.guild_id, item_id, stock)
         stock_msg = f"avec un stock de **{stock}**" if stock is not None else "sans modification de stock"
         embed = discord.Embed(
             title="✅ Item réactivé", 
@@ -324,7 +344,7 @@ class Shop(commands.Cog):
     @app_commands.default_permissions(administrator=True)
     @app_commands.describe(item_id="L'ID de l'item à supprimer")
     async def remove_item(self, interaction: discord.Interaction, item_id: int):
-        item = database.get_item_by_id(item_id)  # Vérifier d'abord si l'item existe
+        item = await db.get_item_by_id(interaction.guild_id, item_id)  # Vérifier d'abord si l'item existe
         if not item:
             await interaction.response.send_message(embed=discord.Embed(
                 title="❌ Erreur", 
@@ -333,7 +353,7 @@ class Shop(commands.Cog):
             ))
             return
 
-        success = database.remove_item(item_id)
+        success = await db.remove_item(interaction.guild_id, item_id)
         if success:
             await interaction.response.send_message(embed=discord.Embed(
                 title="🗑️ Item Supprimé", 
@@ -353,21 +373,10 @@ class Shop(commands.Cog):
     async def items_list(self, interaction: discord.Interaction):
         """Affiche tous les items du système (admin seulement)"""
         try:
-            all_items = database.get_all_items()
-            
-            if not all_items:
-                return await interaction.response.send_message(
-                    embed=discord.Embed(
-                        title="📦 Liste des items",
-                        description="Aucun item trouvé dans la base de données.",
-                        color=discord.Color.orange()
-                    ),
-                    ephemeral=True
-                )
-            
             await self.send_paginated(
                 interaction=interaction,
-                data=all_items,
+                fetch_page=lambda after, limit: db.get_all_items_page(interaction.guild_id, after, limit),
+                page_key=lambda item: item[0],
                 title="📦 Tous les items (Admin) - Tri par ID",
                 color=discord.Color.purple(),
                 items_per_page=5
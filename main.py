@@ -1,12 +1,15 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
 import os
 import asyncio
 from dotenv import load_dotenv
-from flask import Flask
+from flask import Flask, jsonify
 from threading import Thread
 import logging
 
+import metrics
+
 # Configuration du logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,10 +28,28 @@ intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """Arbre des commandes slash qui mesure chaque commande (durée, appels à la base, erreurs)"""
+
+    async def interaction_check(self, interaction):
+        if interaction.type is discord.InteractionType.application_command:
+            interaction.extras["metrics"] = metrics.start_interaction(interaction.created_at)
+        return True
+
+    async def on_error(self, interaction, error):
+        stats = interaction.extras.pop("metrics", None)
+        if stats is not None:
+            command = interaction.command.qualified_name if interaction.command else "inconnue"
+            metrics.finish_interaction(stats, command, error)
+        await super().on_error(interaction, error)
+
 bot = commands.Bot(
     command_prefix="!",
+    tree_cls=InstrumentedCommandTree,
     intents=intents,
     help_command=None,
+    # L'économie est propre à chaque serveur : pas de commandes en messages privés
+    allowed_contexts=app_commands.AppCommandContext(guild=True),
     activity=discord.Activity(
         type=discord.ActivityType.watching,
         name="vos commandes"
@@ -66,6 +87,13 @@ async def on_ready():
     except Exception as e:
         logger.error(f"Erreur synchronisation: {e}")
 
+@bot.event
+async def on_app_command_completion(interaction, command):
+    """Fin d'une commande slash sans erreur"""
+    stats = interaction.extras.pop("metrics", None)
+    if stats is not None:
+        metrics.finish_interaction(stats, command.qualified_name)
+
 @bot.command()
 @commands.is_owner()
 async def sync(ctx):
@@ -89,6 +117,18 @@ def run_flask():
     @app.route('/health')
     def health():
         return "OK", 200
+
+    @app.route('/health/db')
+    def health_db():
+        """Profondeur de file et occupation des threads de la base de données"""
+        from async_database import db
+        return jsonify(db.get_metrics()), 200
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        """Latences des commandes slash et des fonctions de la base, au format Prometheus"""
+        from async_database import db
+        return metrics.render(db.get_metrics()), 200, {"Content-Type": metrics.CONTENT_TYPE}
     
     app.run(host='0.0.0.0', port=PORT)
 
@@ -101,6 +141,18 @@ if __name__ == "__main__":
     flask_thread.start()
     logger.info(f"Serveur Flask démarré sur le port {PORT}")
 
+    # Mettre le schéma de la base à jour avant de charger les cogs
+    # (import tardif : DATABASE_URL peut venir de token.env, chargé plus haut)
+    import migrations
+    applied = migrations.run_migrations()
+    logger.info(f"Schéma de la base à jour (version {migrations.LATEST_VERSION}, {len(applied)} migration(s) appliquée(s))")
+
+    # Plusieurs processus partagent la base : invalider le cache des comptes sur leurs écritures
+    import database
+    if database.ACCOUNT_CACHE_NOTIFY:
+        database.start_account_cache_listener()
+        logger.info("Écoute des modifications de comptes des autres processus activée")
+
     # Démarrer le bot
     try:
         logger.info("Démarrage du bot Discord...")
@@ -0,0 +1,158 @@
+import bisect
+import contextvars
+import threading
+import time
+from datetime import datetime, timezone
+
+# Type MIME du format texte de Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bornes des histogrammes de latence, en secondes
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bornes de l'histogramme du nombre d'appels à la base par commande
+DB_CALLS_BUCKETS = (0, 1, 2, 3, 4, 6, 8, 12, 16, 32)
+
+# Nom -> (type, description, bornes pour les histogrammes)
+DEFINITIONS = {
+    "bot_interaction_delay_seconds": ("histogram", "Délai entre la création de l'interaction par Discord et le début de son traitement", LATENCY_BUCKETS),
+    "bot_command_duration_seconds": ("histogram", "Durée de traitement des commandes slash, par commande et issue", LATENCY_BUCKETS),
+    "bot_command_db_seconds": ("histogram", "Temps passé dans la base de données par commande slash", LATENCY_BUCKETS),
+    "bot_command_db_calls": ("histogram", "Nombre d'appels à la base de données par commande slash", DB_CALLS_BUCKETS),
+    "bot_command_errors_total": ("counter", "Commandes slash terminées en erreur, par type d'erreur", None),
+    "bot_db_call_duration_seconds": ("histogram", "Durée d'exécution des fonctions de database.py, par fonction", LATENCY_BUCKETS),
+    "bot_db_queue_wait_seconds": ("histogram", "Attente d'un thread libre avant l'exécution d'une fonction de database.py", LATENCY_BUCKETS),
+    "bot_db_call_errors_total": ("counter", "Fonctions de database.py terminées par une exception, par fonction", None),
+}
+
+class Histogram:
+    """Histogramme cumulatif à bornes fixes (le verrou est celui du Registry)."""
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, buckets, value):
+        index = bisect.bisect_left(buckets, value)
+        if index < len(buckets):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Registry:
+    """Compteurs et histogrammes en mémoire, thread-safe, rendus au format texte de Prometheus."""
+
+    def __init__(self, definitions=DEFINITIONS):
+        self.definitions = definitions
+        self._series = {name: {} for name in definitions}  # {nom: {labels triés: Histogram ou int}}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        buckets = self.definitions[name][2]
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            histogram = self._series[name].get(key)
+            if histogram is None:
+                histogram = self._series[name][key] = Histogram(buckets)
+            histogram.observe(buckets, value)
+
+    def inc(self, name, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series[name]
+            series[key] = series.get(key, 0) + amount
+
+    def render(self, gauges=None):
+        """
+        Retourne toutes les métriques au format texte de Prometheus.
+        :param gauges: {nom: (description, valeur)} de jauges calculées au moment de la requête
+        """
+        lines = []
+        with self._lock:
+            for name, (kind, description, buckets) in self.definitions.items():
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in self._series[name].items():
+                    if kind == "counter":
+                        lines.append(f"{name}{_format_labels(labels)} {value}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(buckets, value.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {value.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {value.count}")
+        for name, (description, value) in (gauges or {}).items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+class InteractionStats:
+    """Mesures d'une commande slash en cours : début et appels à la base faits pour elle."""
+    __slots__ = ("started", "db_calls", "db_seconds")
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.db_calls = 0
+        self.db_seconds = 0.0
+
+# Commande slash en cours de traitement dans la tâche courante (None hors commande)
+_current_interaction = contextvars.ContextVar("current_interaction", default=None)
+
+def start_interaction(created_at=None):
+    """Démarre la mesure d'une commande slash ; les appels à la base de la tâche courante lui sont attribués."""
+    if created_at is not None:
+        delay = (datetime.now(timezone.utc) - created_at).total_seconds()
+        registry.observe("bot_interaction_delay_seconds", max(delay, 0.0))
+    stats = InteractionStats()
+    _current_interaction.set(stats)
+    return stats
+
+def current_interaction():
+    return _current_interaction.get()
+
+def finish_interaction(stats, command, error=None):
+    """Enregistre la durée d'une commande slash et ses appels à la base."""
+    status = "ok" if error is None else "error"
+    registry.observe("bot_command_duration_seconds", time.monotonic() - stats.started, command=command, status=status)
+    registry.observe("bot_command_db_seconds", stats.db_seconds, command=command)
+    registry.observe("bot_command_db_calls", stats.db_calls, command=command)
+    if error is not None:
+        # Les erreurs d'exécution sont enveloppées dans CommandInvokeError : on compte l'erreur d'origine
+        error = getattr(error, "original", error)
+        registry.inc("bot_command_errors_total", command=command, error=type(error).__name__)
+
+def record_db_call(function, wait, duration, failed):
+    """Enregistre un appel à une fonction de database.py (depuis le thread qui l'a exécutée)."""
+    registry.observe("bot_db_queue_wait_seconds", wait)
+    registry.observe("bot_db_call_duration_seconds", duration, function=function)
+    if failed:
+        registry.inc("bot_db_call_errors_total", function=function)
+
+def render(db_metrics=None):
+    """Métriques au format Prometheus, avec l'état du pool de threads de la base (AsyncDatabase.get_metrics())."""
+    gauges = {}
+    if db_metrics is not None:
+        gauges = {
+            "bot_db_workers": ("Threads qui exécutent les fonctions de database.py", db_metrics["workers"]),
+            "bot_db_queued": ("Appels à la base en attente d'un thread", db_metrics["queued"]),
+            "bot_db_running": ("Appels à la base en cours d'exécution", db_metrics["running"]),
+        }
+    return registry.render(gauges)
@@ -0,0 +1,414 @@
+import argparse
+import os
+
+import database
+
+# Identifiant du verrou consultatif PostgreSQL qui sérialise les migrations entre processus
+MIGRATIONS_LOCK_ID = 7_310_412_001
+
+# Index des recherches fréquentes sur le catalogue. La clé primaire (user_id, shop_id, item_id)
+# de user_items sert déjà d'index pour les recherches par user_id.
+CATALOGUE_INDEXES = [
+    # Unicité des noms dans un shop (doublons vérifiés par add_item_to_shop)
+    "CREATE UNIQUE INDEX IF NOT EXISTS items_shop_id_name_key ON items (shop_id, name)",
+    # get_shop_items_page : items actifs d'un shop, triés par prix
+    "CREATE INDEX IF NOT EXISTS items_active_shop_id_price_idx ON items (shop_id, price, item_id) WHERE active = 1",
+    # get_item_by_name : WHERE name = ... ORDER BY item_id LIMIT 1
+    "CREATE INDEX IF NOT EXISTS items_name_item_id_idx ON items (name, item_id)",
+]
+
+def rename_duplicate_items(cursor):
+    """
+    Préalable à items_shop_id_name_key : l'ancien add_item_to_shop (SELECT puis INSERT) a pu créer
+    des doublons (shop_id, name) sous concurrence. Le plus ancien garde son nom, les autres sont
+    renommés « nom #item_id » ; leurs IDs, et donc les inventaires, sont conservés.
+    """
+    cursor.execute("""
+        UPDATE items i
+        SET name = i.name || ' #' || i.item_id
+        FROM (
+            SELECT item_id, row_number() OVER (PARTITION BY shop_id, name ORDER BY item_id) AS position
+            FROM items
+            WHERE shop_id IS NOT NULL
+        ) d
+        WHERE i.item_id = d.item_id AND d.position > 1
+        RETURNING i.item_id, i.shop_id, i.name
+    """)
+    for item_id, shop_id, name in cursor.fetchall():
+        print(f"Item en double renommé dans le shop {shop_id} : item {item_id} -> '{name}'")
+
+# Économie par serveur (migration 7). Les lignes antérieures à la migration sont rattachées au
+# serveur LEGACY_GUILD_ID : le définir avant la migration avec l'ID du serveur qui utilisait
+# l'économie existante. Sans lui, la migration refuse de s'appliquer sur une base non vide.
+LEGACY_GUILD_ID = int(os.environ['LEGACY_GUILD_ID']) if os.getenv('LEGACY_GUILD_ID') else None
+GUILD_TABLES = ("shops", "items", "users", "user_items", "bank_deposit", "role_salaries", "salary_cooldowns", "transactions")
+
+GUILD_PRIMARY_KEYS = {
+    "users": "guild_id, user_id",
+    "bank_deposit": "guild_id, user_id",
+    "salary_cooldowns": "guild_id, user_id",
+    "user_items": "guild_id, user_id, shop_id, item_id",
+}
+
+GUILD_FOREIGN_KEYS = [
+    ("user_items", "user_items_user_id_fkey"),
+    ("bank_deposit", "bank_deposit_user_id_fkey"),
+    ("salary_cooldowns", "salary_cooldowns_user_id_fkey"),
+]
+
+# Les index des migrations 3, 5 et 6 et du journal, préfixés par guild_id : chaque requête
+# ne parcourt que les lignes de son serveur
+GUILD_INDEXES = [
+    ("users_balance_user_id_idx", "CREATE INDEX IF NOT EXISTS users_guild_id_balance_user_id_idx ON users (guild_id, balance DESC, user_id)"),
+    ("bank_deposit_amount_user_id_idx", "CREATE INDEX IF NOT EXISTS bank_deposit_guild_id_amount_user_id_idx ON bank_deposit (guild_id, amount DESC, user_id)"),
+    ("user_items_user_id_quantity_idx", "CREATE INDEX IF NOT EXISTS user_items_guild_id_user_id_quantity_idx ON user_items (guild_id, user_id, quantity, shop_id, item_id)"),
+    ("transactions_user_id_created_at_idx", "CREATE INDEX IF NOT EXISTS transactions_guild_id_user_id_created_at_idx ON transactions (guild_id, user_id, created_at)"),
+    ("items_name_item_id_idx", "CREATE INDEX IF NOT EXISTS items_guild_id_name_item_id_idx ON items (guild_id, name, item_id)"),
+    # get_shops_page, get_all_items_page et /salaries
+    (None, "CREATE INDEX IF NOT EXISTS shops_guild_id_shop_id_idx ON shops (guild_id, shop_id)"),
+    (None, "CREATE INDEX IF NOT EXISTS items_guild_id_item_id_idx ON items (guild_id, item_id)"),
+    (None, "CREATE INDEX IF NOT EXISTS role_salaries_guild_id_idx ON role_salaries (guild_id)"),
+]
+
+def check_legacy_guild(cursor):
+    """Préalable à la migration 7 : refuse de rattacher une économie existante à un serveur qu'aucune commande ne voit."""
+    if LEGACY_GUILD_ID is not None:
+        return
+    filled = []
+    for table in GUILD_TABLES:
+        cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table})")
+        if cursor.fetchone()[0]:
+            filled.append(table)
+    if filled:
+        raise RuntimeError(
+            f"Des données existent déjà ({', '.join(filled)}) : définir LEGACY_GUILD_ID avec l'ID du serveur "
+            "Discord qui les utilise avant de migrer vers l'économie par serveur"
+        )
+
+def guild_migration():
+    """Étapes de la migration 7 : colonne guild_id partout, clés composites et index par serveur."""
+    statements = [check_legacy_guild]
+    for table in GUILD_TABLES:
+        # Tables vides si LEGACY_GUILD_ID n'est pas défini (check_legacy_guild) : la valeur par défaut est sans effet
+        statements.append(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS guild_id BIGINT NOT NULL DEFAULT {LEGACY_GUILD_ID or 0:d}")
+        statements.append(f"ALTER TABLE {table} ALTER COLUMN guild_id DROP DEFAULT")
+    for table, constraint in GUILD_FOREIGN_KEYS:
+        statements.append(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}")
+    for table, columns in GUILD_PRIMARY_KEYS.items():
+        statements.append(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_pkey")
+        statements.append(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({columns})")
+    for table, constraint in GUILD_FOREIGN_KEYS:
+        statements.append(
+            f"ALTER TABLE {table} ADD CONSTRAINT {constraint} "
+            f"FOREIGN KEY (guild_id, user_id) REFERENCES users (guild_id, user_id)"
+        )
+    for replaced, statement in GUILD_INDEXES:
+        if replaced:
+            statements.append(f"DROP INDEX IF EXISTS {replaced}")
+        statements.append(statement)
+    return statements
+
+# Migrations ordonnées : (version, description, requêtes SQL ou fonctions(cursor)). Ne jamais
+# modifier une migration déjà déployée : ajouter une nouvelle version à la fin de la liste.
+MIGRATIONS = [
+    (1, "Tables initiales", [
+        # Table shops avec description
+        """
+        CREATE TABLE IF NOT EXISTS shops (
+            shop_id SERIAL PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT DEFAULT ''
+        )
+        """,
+        # Table items avec description et stock
+        """
+        CREATE TABLE IF NOT EXISTS items (
+            item_id SERIAL PRIMARY KEY,
+            shop_id INTEGER REFERENCES shops(shop_id),
+            name TEXT NOT NULL,
+            price INTEGER NOT NULL,
+            description TEXT DEFAULT '',
+            stock INTEGER DEFAULT -1,
+            active INTEGER DEFAULT 1
+        )
+        """,
+        # Table utilisateurs (balance)
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id BIGINT PRIMARY KEY,
+            balance INTEGER DEFAULT 0
+        )
+        """,
+        # Inventaire avec quantité
+        """
+        CREATE TABLE IF NOT EXISTS user_items (
+            user_id BIGINT REFERENCES users(user_id),
+            shop_id INTEGER REFERENCES shops(shop_id),
+            item_id INTEGER REFERENCES items(item_id),
+            quantity INTEGER DEFAULT 1,
+            PRIMARY KEY (user_id, shop_id, item_id)
+        )
+        """,
+        # Dépôts bancaires
+        """
+        CREATE TABLE IF NOT EXISTS bank_deposit (
+            user_id BIGINT PRIMARY KEY REFERENCES users(user_id),
+            amount INTEGER DEFAULT 0
+        )
+        """,
+        # Salaires des rôles
+        """
+        CREATE TABLE IF NOT EXISTS role_salaries (
+            role_id BIGINT PRIMARY KEY,
+            salary INTEGER,
+            cooldown INTEGER DEFAULT 3600
+        )
+        """,
+        # Cooldown salaires utilisateurs
+        """
+        CREATE TABLE IF NOT EXISTS salary_cooldowns (
+            user_id BIGINT PRIMARY KEY REFERENCES users(user_id),
+            last_collect TIMESTAMP
+        )
+        """,
+    ]),
+    (2, "Journal des transactions", [
+        # Append-only, écrit dans la même transaction que chaque mouvement
+        """
+        CREATE TABLE IF NOT EXISTS transactions (
+            transaction_id BIGSERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            kind TEXT NOT NULL,
+            wallet_delta INTEGER NOT NULL DEFAULT 0,
+            bank_delta INTEGER NOT NULL DEFAULT 0,
+            counterparty BIGINT,
+            item_id INTEGER,
+            quantity INTEGER,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS transactions_user_id_created_at_idx
+        ON transactions (user_id, created_at)
+        """,
+    ]),
+    (3, "Index du catalogue", [rename_duplicate_items] + CATALOGUE_INDEXES),
+    (4, "Séquence des items recalée après les IDs attribués par MAX(item_id) + 1", [
+        """
+        SELECT setval(pg_get_serial_sequence('items', 'item_id'), COALESCE(MAX(item_id), 0) + 1, false)
+        FROM items
+        """,
+    ]),
+    (5, "Index de l'inventaire trié par quantité", [
+        # get_user_inventory_page(sort="quantity") ; le tri par shop utilise la clé primaire
+        "CREATE INDEX IF NOT EXISTS user_items_user_id_quantity_idx ON user_items (user_id, quantity, shop_id, item_id)",
+    ]),
+    (6, "Index des classements", [
+        # Top des portefeuilles et des dépôts, et rang d'un utilisateur (COUNT des valeurs supérieures)
+        "CREATE INDEX IF NOT EXISTS users_balance_user_id_idx ON users (balance DESC, user_id)",
+        "CREATE INDEX IF NOT EXISTS bank_deposit_amount_user_id_idx ON bank_deposit (amount DESC, user_id)",
+    ]),
+    (7, "Économie par serveur (guild_id)", guild_migration()),
+    (8, "Version réservée : suppression de la table des écritures différées abandonnées", [
+        # Une version de test des écritures différées de update_balance a créé cette table en
+        # version 8 ; la fonctionnalité a été abandonnée et la version reste réservée
+        "DROP TABLE IF EXISTS write_behind_batches",
+    ]),
+    (9, "Fortune totale indexée : colonne users.total (portefeuille + banque)", [
+        # Tenue à jour par chaque requête qui modifie le portefeuille ; les mouvements bancaires
+        # déplacent de l'argent entre balance et bank_deposit sans la changer
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS total BIGINT NOT NULL DEFAULT 0",
+        """
+        UPDATE users u
+        SET total = COALESCE(u.balance, 0) + COALESCE(
+            (SELECT b.amount FROM bank_deposit b WHERE b.guild_id = u.guild_id AND b.user_id = u.user_id), 0
+        )
+        """,
+        # Classement "total" et rang dans ce classement
+        "CREATE INDEX IF NOT EXISTS users_guild_id_total_user_id_idx ON users (guild_id, total DESC, user_id)",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(cursor):
+    """Version actuelle du schéma (0 si la table schema_version n'existe pas encore)."""
+    cursor.execute("SELECT to_regclass('schema_version') IS NOT NULL")
+    if not cursor.fetchone()[0]:
+        return 0
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+def run_migrations():
+    """
+    Applique les migrations manquantes, chacune dans sa propre transaction, sous un
+    verrou consultatif pour qu'un seul processus migre à la fois.
+    :return: liste des versions appliquées
+    """
+    conn = database.connect_db()
+    try:
+        cursor = conn.cursor()
+        if get_schema_version(cursor) >= LATEST_VERSION:
+            return []
+        conn.rollback()
+
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATIONS_LOCK_ID,))
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+                )
+            """)
+            conn.commit()
+
+            # Relu sous verrou : un autre processus a pu migrer entre-temps
+            current = get_schema_version(cursor)
+            applied = []
+            for version, description, statements in MIGRATIONS:
+                if version <= current:
+                    continue
+                try:
+                    for statement in statements:
+                        if callable(statement):
+                            statement(cursor)
+                        else:
+                            cursor.execute(statement)
+                    cursor.execute(
+                        "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                        (version, description)
+                    )
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    print(f"Erreur lors de la migration {version} ({description}) : {e}")
+                    raise e
+                print(f"Migration {version} appliquée : {description}")
+                applied.append(version)
+            return applied
+        finally:
+            conn.rollback()
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATIONS_LOCK_ID,))
+            conn.commit()
+    finally:
+        conn.close()
+
+# Tables par membre partitionnables par serveur (les shops et items restent des tables simples)
+PARTITIONED_TABLES = ("users", "bank_deposit", "salary_cooldowns", "user_items", "transactions")
+
+def _partition_tables(cursor, tables, partitions):
+    # Clés étrangères (dans les deux sens), clés primaires, index et séquences, lus avant la conversion
+    params = {"tables": list(tables)}
+    cursor.execute("""
+        SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE contype = 'f' AND conparentid = 0 AND (conrelid = ANY(%(tables)s::regclass[]) OR confrelid = ANY(%(tables)s::regclass[]))
+    """, params)
+    foreign_keys = cursor.fetchall()
+    cursor.execute("""
+        SELECT c.conrelid::regclass::text, c.conname, array_agg(a.attname::text ORDER BY k.position)
+        FROM pg_constraint c
+        CROSS JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(attnum, position)
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+        WHERE c.contype = 'p' AND c.conrelid = ANY(%(tables)s::regclass[])
+        GROUP BY c.conrelid, c.conname
+    """, params)
+    primary_keys = cursor.fetchall()
+    cursor.execute("""
+        SELECT indexdef
+        FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = ANY(%(tables)s)
+          AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE contype IN ('p', 'u'))
+    """, params)
+    indexes = [indexdef for (indexdef,) in cursor.fetchall()]
+    cursor.execute("""
+        SELECT table_name, column_name, pg_get_serial_sequence(table_name, column_name)
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = ANY(%(tables)s)
+          AND pg_get_serial_sequence(table_name, column_name) IS NOT NULL
+    """, params)
+    sequences = cursor.fetchall()
+
+    # Sinon supprimées avec l'ancienne table
+    for _, _, sequence in sequences:
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    for table in tables:
+        print(f"Partitionnement de {table} en {partitions} partitions...")
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_unpartitioned")
+        cursor.execute(f"CREATE TABLE {table} (LIKE {table}_unpartitioned INCLUDING DEFAULTS) PARTITION BY HASH (guild_id)")
+        for remainder in range(partitions):
+            cursor.execute(
+                f"CREATE TABLE {table}_p{remainder} PARTITION OF {table} "
+                f"FOR VALUES WITH (MODULUS {partitions:d}, REMAINDER {remainder:d})"
+            )
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {table}_unpartitioned")
+    for table in tables:
+        cursor.execute(f"DROP TABLE {table}_unpartitioned CASCADE")
+
+    for table, constraint, columns in primary_keys:
+        # La clé primaire d'une table partitionnée doit contenir la clé de partitionnement
+        if "guild_id" not in columns:
+            columns = ["guild_id"] + columns
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {constraint} PRIMARY KEY ({', '.join(columns)})")
+    for indexdef in indexes:
+        cursor.execute(indexdef)
+    for table, constraint, definition in foreign_keys:
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {constraint} {definition}")
+    for table, column, sequence in sequences:
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.{column}")
+    for table in tables:
+        cursor.execute(f"ANALYZE {table}")
+
+def partition_by_guild(partitions):
+    """
+    Optionnel, pour les déploiements multi-serveurs volumineux : convertit les tables par membre en
+    tables partitionnées par hachage de guild_id (PARTITION BY HASH), en une seule transaction.
+    Les requêtes filtrées par guild_id ne lisent alors qu'une partition. Clés, index et clés
+    étrangères sont recréés à l'identique ; la clé primaire de transactions devient
+    (guild_id, transaction_id), une clé primaire devant contenir la clé de partitionnement.
+    :return: liste des tables converties (celles déjà partitionnées sont ignorées)
+    """
+    conn = database.connect_db()
+    try:
+        cursor = conn.cursor()
+        if get_schema_version(cursor) < 7:
+            raise RuntimeError("Le partitionnement par serveur demande le schéma en version 7 ou plus")
+        conn.rollback()
+
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATIONS_LOCK_ID,))
+        try:
+            cursor.execute("""
+                SELECT relname
+                FROM pg_class
+                WHERE relname = ANY(%s) AND relkind = 'r' AND relnamespace = current_schema()::regnamespace
+            """, (list(PARTITIONED_TABLES),))
+            found = {relname for (relname,) in cursor.fetchall()}
+            tables = [table for table in PARTITIONED_TABLES if table in found]
+            if tables:
+                _partition_tables(cursor, tables, partitions)
+                conn.commit()
+            return tables
+        except Exception as e:
+            conn.rollback()
+            print(f"Erreur lors du partitionnement par serveur : {e}")
+            raise e
+        finally:
+            conn.rollback()
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATIONS_LOCK_ID,))
+            conn.commit()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Met à jour le schéma de la base.")
+    parser.add_argument(
+        "--partition-by-guild", type=int, metavar="N",
+        help="Convertit ensuite les tables par membre en N partitions par serveur (opération longue, une seule fois)"
+    )
+    args = parser.parse_args()
+    applied = run_migrations()
+    print(f"Schéma à jour (version {LATEST_VERSION}), {len(applied)} migration(s) appliquée(s).")
+    if args.partition_by_guild:
+        converted = partition_by_guild(args.partition_by_guild)
+        print(f"{len(converted)} table(s) partitionnée(s) par serveur : {', '.join(converted) or 'aucune'}")
@@ -0,0 +1,67 @@
+import threading
+
+from cache import MISSING, AccountCache, TTLCache
+
+def test_ttl_cache_set_ignores_result_read_before_invalidation():
+    cache = TTLCache()
+    generation = cache.generation
+    cache.invalidate(("item_id", 1, 10))
+    cache.set(("item_id", 1, 10), "périmé", generation)
+    assert cache.get(("item_id", 1, 10)) is MISSING
+
+    cache.set(("item_id", 1, 10), "à jour", cache.generation)
+    assert cache.get(("item_id", 1, 10)) == "à jour"
+
+def test_ttl_cache_invalidate_where_bumps_generation():
+    cache = TTLCache()
+    cache.set(("shops_page", 1, None, 5), ())
+    cache.set(("shops_page", 2, None, 5), ())
+    generation = cache.generation
+    cache.invalidate_where(lambda key: key[1] == 1)
+    assert cache.get(("shops_page", 1, None, 5)) is MISSING
+    assert cache.get(("shops_page", 2, None, 5)) == ()
+    assert cache.generation != generation
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+def test_account_cache_update_keeps_unchanged_fields():
+    cache = AccountCache()
+    cache.set((1, 42), 100, 50, items=3)
+    cache.update((1, 42), wallet=80, items_delta=2)
+    assert cache.get((1, 42), with_items=True) == (80, 50, 5)
+    cache.update((1, 43), wallet=10)
+    assert cache.get((1, 43)) is None
+
+def test_account_cache_drain_waits_for_writes_in_progress():
+    cache = AccountCache(stripes=4)
+    writing = threading.Event()
+    release = threading.Event()
+    drained = threading.Event()
+
+    def write():
+        with cache.lock((1, 42)):
+            writing.set()
+            release.wait(5)
+
+    def drain():
+        cache.drain()
+        drained.set()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    assert writing.wait(5)
+    drainer = threading.Thread(target=drain)
+    drainer.start()
+    assert not drained.wait(0.2)
+
+    release.set()
+    assert drained.wait(5)
+    writer.join()
+    drainer.join()
@@ -0,0 +1,67 @@
+from cache import Ranking
+
+def loaded_ranking(rows, capacity=3):
+    ranking = Ranking(capacity=capacity)
+    ranking.load(rows, ranking.begin_load())
+    return ranking
+
+def test_update_above_floor_evicts_lowest_entry():
+    ranking = loaded_ranking([(1, 50), (2, 40), (3, 30)])
+    ranking.update(4, 45)
+    assert ranking.top(3) == [(1, 50), (4, 45), (2, 40)]
+    assert ranking.rank_of(3) is None
+
+    # Sous le plancher (30) : l'utilisateur reste hors de la table
+    ranking.update(5, 20)
+    assert ranking.rank_of(5) is None
+    assert ranking.top(3) == [(1, 50), (4, 45), (2, 40)]
+
+def test_update_below_floor_removes_entry():
+    ranking = loaded_ranking([(1, 50), (2, 40), (3, 30)])
+    ranking.update(2, 10)
+    assert ranking.rank_of(2) is None
+    assert ranking.top(2) == [(1, 50), (3, 30)]
+
+def test_top_requires_reload_when_table_is_shorter_than_limit():
+    ranking = loaded_ranking([(1, 50), (2, 40), (3, 30)])
+    ranking.update(2, 10)
+    assert ranking.top(3) is None
+    assert not ranking.loaded
+
+def test_top_serves_short_table_when_it_contains_everyone():
+    ranking = loaded_ranking([(1, 50), (2, 40)])
+    assert ranking.top(10) == [(1, 50), (2, 40)]
+    ranking.update(3, 5)
+    assert ranking.top(10) == [(1, 50), (2, 40), (3, 5)]
+
+def test_load_replays_writes_received_during_query():
+    ranking = Ranking(capacity=3)
+    session = ranking.begin_load()
+    assert ranking.tracking
+    ranking.update(3, 60)
+    ranking.update(1, 35)
+    ranking.load([(1, 50), (2, 40), (3, 30)], session)
+    assert ranking.top(3) == [(3, 60), (2, 40), (1, 35)]
+    assert ranking.rank_of(1) == (3, 35)
+
+def test_load_ignores_session_ended_by_invalidation():
+    ranking = Ranking(capacity=3)
+    stale = ranking.begin_load()
+    ranking.invalidate()
+    session = ranking.begin_load()
+    assert session is not stale
+
+    ranking.load([(1, 50), (2, 40), (3, 30)], stale)
+    assert not ranking.loaded
+    ranking.load([(1, 55), (2, 40), (3, 30)], session)
+    assert ranking.top(1) == [(1, 55)]
+
+def test_concurrent_loads_share_session_and_first_wins():
+    ranking = Ranking(capacity=3)
+    first = ranking.begin_load()
+    second = ranking.begin_load()
+    assert first is second
+
+    ranking.load([(1, 50), (2, 40), (3, 30)], first)
+    ranking.load([(1, 10), (2, 9), (3, 8)], second)
+    assert ranking.top(1) == [(1, 50)]